@@ -10,8 +10,8 @@ Who Visions LLC - Unk Agent System
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, KeysView, List, Optional, Tuple
+from dataclasses import dataclass
 from pathlib import Path
 
 
@@ -27,6 +27,20 @@ class PriceSnapshot:
     unit: str
     tier_start: Optional[float] = None
     metadata: Optional[Dict] = None
+    
+    def to_dict(self) -> Dict:
+        """Shallow dict form for JSON storage (cheaper than dataclasses.asdict)."""
+        return {
+            "timestamp": self.timestamp,
+            "service": self.service,
+            "sku_id": self.sku_id,
+            "sku_description": self.sku_description,
+            "price_type": self.price_type,
+            "price_per_unit": self.price_per_unit,
+            "unit": self.unit,
+            "tier_start": self.tier_start,
+            "metadata": self.metadata,
+        }
 
 
 @dataclass
@@ -51,8 +65,23 @@ class PriceTracker:
     def __init__(self, storage_path: str = "data/price_history.json"):
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        # Insertion-ordered dict used as a set: keys stay in first-seen order
+        self._known_keys: Dict[Tuple[str, str, str], None] = {}
         self.history: List[PriceSnapshot] = self._load_history()
     
+    @property
+    def known_keys(self) -> KeysView[Tuple[str, str, str]]:
+        """
+        (service, sku_id, price_type) keys with at least one snapshot.
+        
+        A live, read-only set view in first-seen order; membership is O(1).
+        """
+        return self._known_keys.keys()
+    
+    def __contains__(self, key: Tuple[str, str, str]) -> bool:
+        """O(1) check for any history under a (service, sku_id, price_type) key."""
+        return key in self._known_keys
+    
     def _load_history(self) -> List[PriceSnapshot]:
         """Load price history from storage."""
         if not self.storage_path.exists():
@@ -61,16 +90,22 @@ class PriceTracker:
         try:
             with open(self.storage_path, 'r') as f:
                 data = json.load(f)
-                return [PriceSnapshot(**item) for item in data]
+                history = [PriceSnapshot(**item) for item in data]
+                self._known_keys.update(
+                    dict.fromkeys((s.service, s.sku_id, s.price_type) for s in history)
+                )
+                return history
         except Exception as e:
             print(f"Error loading price history: {e}")
             return []
     
     def _save_history(self):
-        """Save price history to storage."""
+        """Save price history to storage (atomically, via a temp file)."""
+        tmp_path = self.storage_path.with_name(self.storage_path.name + ".tmp")
         try:
-            with open(self.storage_path, 'w') as f:
-                json.dump([asdict(snapshot) for snapshot in self.history], f, indent=2)
+            with open(tmp_path, 'w') as f:
+                json.dump([snapshot.to_dict() for snapshot in self.history], f, indent=2)
+            os.replace(tmp_path, self.storage_path)
         except Exception as e:
             print(f"Error saving price history: {e}")
     
@@ -99,7 +134,24 @@ class PriceTracker:
         )
         
         self.history.append(snapshot)
+        self._known_keys.setdefault((service, sku_id, price_type))
+        self._save_history()
+    
+    def bulk_import(self, snapshots: List[PriceSnapshot]) -> int:
+        """
+        Record many price snapshots with a single save.
+        
+        Returns the number of snapshots added.
+        """
+        if not snapshots:
+            return 0
+        
+        self.history.extend(snapshots)
+        self._known_keys.update(
+            dict.fromkeys((s.service, s.sku_id, s.price_type) for s in snapshots)
+        )
         self._save_history()
+        return len(snapshots)
     
     def get_latest_price(
         self,
@@ -108,6 +160,9 @@ class PriceTracker:
         price_type: Optional[str] = None
     ) -> Optional[PriceSnapshot]:
         """Get the most recent price for a SKU."""
+        if price_type is not None and (service, sku_id, price_type) not in self._known_keys:
+            return None
+        
         matches = [
             s for s in self.history
             if s.service == service and s.sku_id == sku_id
@@ -243,12 +298,15 @@ class PriceTracker:
         days: int = 30
     ) -> Dict[str, any]:
         """Get price trend analysis for a specific SKU."""
-        history = self.get_price_history(
-            service=service,
-            sku_id=sku_id,
-            price_type=price_type,
-            days=days
-        )
+        if (service, sku_id, price_type) not in self._known_keys:
+            history = []
+        else:
+            history = self.get_price_history(
+                service=service,
+                sku_id=sku_id,
+                price_type=price_type,
+                days=days
+            )
         
         if len(history) < 2:
             return {
@@ -299,9 +357,13 @@ class PriceTracker:
         }
     
     def import_from_csv(self, csv_path: str):
-        """Import pricing data from CSV file."""
+        """Import pricing data from CSV file (saved once, as a single batch)."""
         import csv
         
+        # One import is one point in time
+        timestamp = datetime.utcnow().isoformat()
+        snapshots = []
+        
         with open(csv_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             
@@ -340,7 +402,8 @@ class PriceTracker:
                     elif "memory" in sku_desc.lower() or "ram" in sku_desc.lower():
                         price_type = "memory"
                     
-                    self.record_price(
+                    snapshots.append(PriceSnapshot(
+                        timestamp=timestamp,
                         service=service,
                         sku_id=sku_id,
                         sku_description=sku_desc,
@@ -352,10 +415,12 @@ class PriceTracker:
                             "service_description": service_desc,
                             "source": "csv_import"
                         }
-                    )
+                    ))
                 except ValueError:
                     continue
         
+        self.bulk_import(snapshots)
+        
         print(f"Imported {len([s for s in self.history if s.metadata.get('source') == 'csv_import'])} price records from CSV")
 
 
@@ -97,33 +97,28 @@ def main():
         print("\n📈 PRICE TRENDS\n")
         print("=" * 80)
         
-        # Get unique service/sku/type combinations
-        seen = set()
-        for snapshot in tracker.history:
-            key = (snapshot.service, snapshot.sku_id, snapshot.price_type)
-            if key not in seen:
-                seen.add(key)
-                trend = tracker.get_price_trend(
-                    service=snapshot.service,
-                    sku_id=snapshot.sku_id,
-                    price_type=snapshot.price_type,
-                    days=args.days
-                )
+        for service, sku_id, price_type in tracker.known_keys:
+            trend = tracker.get_price_trend(
+                service=service,
+                sku_id=sku_id,
+                price_type=price_type,
+                days=args.days
+            )
+            
+            if trend["data_points"] >= 2:
+                trend_emoji = {
+                    "increasing": "📈",
+                    "decreasing": "📉",
+                    "stable": "➡️"
+                }.get(trend["trend"], "❓")
                 
-                if trend["data_points"] >= 2:
-                    trend_emoji = {
-                        "increasing": "📈",
-                        "decreasing": "📉",
-                        "stable": "➡️"
-                    }.get(trend["trend"], "❓")
-                    
-                    print(f"\n{trend_emoji} {trend['service']} - {trend['sku_description'][:50]}")
-                    print(f"   Type: {trend['price_type']}")
-                    print(f"   Trend: {trend['trend']} ({trend['percentage_change']:.2f}%)")
-                    print(f"   Price Range: ${trend['min_price']:.6f} - ${trend['max_price']:.6f}")
-                    print(f"   Average: ${trend['average_price']:.6f}")
-                    print(f"   Data Points: {trend['data_points']}")
-                    print("-" * 80)
+                print(f"\n{trend_emoji} {trend['service']} - {trend['sku_description'][:50]}")
+                print(f"   Type: {trend['price_type']}")
+                print(f"   Trend: {trend['trend']} ({trend['percentage_change']:.2f}%)")
+                print(f"   Price Range: ${trend['min_price']:.6f} - ${trend['max_price']:.6f}")
+                print(f"   Average: ${trend['average_price']:.6f}")
+                print(f"   Data Points: {trend['data_points']}")
+                print("-" * 80)
         
         print()
     
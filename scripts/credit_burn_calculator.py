@@ -8,9 +8,26 @@ Usage:
     python scripts/credit_burn_calculator.py
 """
 
+import io
 import sys
 from pathlib import Path
 
+# Optional: numba-compiled cost kernel for large scenario sweeps
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    np = None
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernel below still defines without numba."""
+        return lambda func: func
+
+EQ_LINE = "=" * 80
+DASH_LINE = "-" * 80
+
 # Credit information from the screenshot
 CREDITS = {
     "GenAI App Builder Trial": {
@@ -55,21 +72,38 @@ PRICING = {
     }
 }
 
+# Flat per-model rate columns indexed by _MODEL_INDEX (None = no caching tier)
+_MODELS = ("gemini_2_5_flash", "gemini_2_5_pro", "gemini_3_0_pro")
+_MODEL_INDEX = {model: i for i, model in enumerate(_MODELS)}
+_IN_RATES = tuple(PRICING[m]["input_per_1m"] for m in _MODELS)
+_OUT_RATES = tuple(PRICING[m]["output_per_1m"] for m in _MODELS)
+_CACHE_IN_RATES = tuple(PRICING[m].get("caching_input_per_1m") for m in _MODELS)
+
+# One block per usage scenario in the report
+_SCENARIO_TMPL = (
+    "  📌 {name}:\n"
+    "     Requests/day: {requests_per_day:,}\n"
+    "     Avg tokens: {avg_input:,} input + {avg_output:,} output\n"
+    "     Cost/request: ${cost_per_request:.6f}\n"
+    "     Daily cost: ${daily_cost:.2f}\n"
+    "     Requests per $1: {requests_per_dollar:,}\n"
+    "     ⏰ Credits will last: {lifespan}\n"
+    "{caching_note}"
+    "\n"
+)
+_CACHING_NOTE = "     💡 Using caching: 90% savings on input tokens\n"
+
+# JIT compile time only pays off on sweeps well beyond the built-in scenarios
+_JIT_MIN_SCENARIOS = 32
+
 def calculate_cost_per_request(model: str, input_tokens: int, output_tokens: int, use_caching: bool = False) -> float:
-    """Calculate cost for a single request."""
-    if model not in PRICING:
+    """Calculate cost for a single request (unrounded; format at display time)."""
+    i = _MODEL_INDEX.get(model)
+    if i is None:
         return 0.0
     
-    pricing = PRICING[model]
-    
-    if use_caching and "caching_input_per_1m" in pricing:
-        input_cost = (input_tokens / 1_000_000) * pricing["caching_input_per_1m"]
-    else:
-        input_cost = (input_tokens / 1_000_000) * pricing["input_per_1m"]
-    
-    output_cost = (output_tokens / 1_000_000) * pricing["output_per_1m"]
-    
-    return round(input_cost + output_cost, 6)
+    rate_in = _CACHE_IN_RATES[i] if use_caching and _CACHE_IN_RATES[i] is not None else _IN_RATES[i]
+    return (input_tokens * rate_in + output_tokens * _OUT_RATES[i]) / 1_000_000
 
 
 def calculate_requests_per_dollar(model: str, avg_input_tokens: int, avg_output_tokens: int, use_caching: bool = False) -> float:
@@ -87,39 +121,94 @@ def calculate_days_remaining(total_credits: float, daily_spend: float) -> float:
     return round(total_credits / daily_spend, 1)
 
 
+@njit(cache=True)
+def _cost_kernel(input_tokens, output_tokens, in_rates, out_rates, result):
+    """Per-request cost for every scenario; rates are already model/caching resolved."""
+    for k in range(len(input_tokens)):
+        result[k] = (input_tokens[k] * in_rates[k] + output_tokens[k] * out_rates[k]) / 1_000_000
+    return result
+
+
+def calculate_scenario_costs(scenarios: list, total_credits: float) -> dict:
+    """
+    Compute cost columns for every scenario in a single pass.
+    
+    Returns parallel lists (struct-of-arrays) keyed by column name so the
+    report loop only indexes into precomputed values.
+    """
+    model_idx = [_MODEL_INDEX[s["model"]] for s in scenarios]
+    in_rates = [
+        _CACHE_IN_RATES[i] if s["caching"] and _CACHE_IN_RATES[i] is not None else _IN_RATES[i]
+        for s, i in zip(scenarios, model_idx)
+    ]
+    if NUMBA_AVAILABLE and len(scenarios) > _JIT_MIN_SCENARIOS:
+        cost_per_request = _cost_kernel(
+            np.array([s["avg_input"] for s in scenarios], dtype=np.float64),
+            np.array([s["avg_output"] for s in scenarios], dtype=np.float64),
+            np.array(in_rates, dtype=np.float64),
+            np.array([_OUT_RATES[i] for i in model_idx], dtype=np.float64),
+            np.empty(len(scenarios), dtype=np.float64),
+        ).tolist()
+    else:
+        cost_per_request = [
+            (s["avg_input"] * rate_in + s["avg_output"] * _OUT_RATES[i]) / 1_000_000
+            for s, i, rate_in in zip(scenarios, model_idx, in_rates)
+        ]
+    daily_cost = [c * s["requests_per_day"] for c, s in zip(cost_per_request, scenarios)]
+    
+    return {
+        "cost_per_request": cost_per_request,
+        "daily_cost": daily_cost,
+        "days_remaining": [calculate_days_remaining(total_credits, d) for d in daily_cost],
+        "requests_per_dollar": [round(1.0 / c, 2) if c else 0.0 for c in cost_per_request],
+    }
+
+
+def _format_lifespan(days_remaining: float) -> str:
+    """Human-readable credit lifespan for the scenarios table."""
+    if days_remaining == float('inf'):
+        return "Forever (no usage)"
+    if days_remaining > 365:
+        return f"{days_remaining / 365:.1f} years ({days_remaining:.0f} days)"
+    if days_remaining > 30:
+        return f"{days_remaining / 30:.1f} months ({days_remaining:.0f} days)"
+    return f"{days_remaining:.1f} days"
+
+
 def generate_report():
     """Generate credit burn rate report."""
     
     total_available = sum(c["remaining"] for c in CREDITS.values() if c["status"] == "Available")
     total_used = sum(c["original"] - c["remaining"] for c in CREDITS.values() if c["status"] == "Available")
     
-    report = []
-    report.append("=" * 80)
-    report.append("💰 GCP CREDIT BURN RATE ANALYSIS")
-    report.append("=" * 80)
-    report.append("")
+    out = io.StringIO()
+    out.write(f"""{EQ_LINE}
+💰 GCP CREDIT BURN RATE ANALYSIS
+{EQ_LINE}
+
+📊 CURRENT CREDIT STATUS
+{DASH_LINE}
+""")
     
     # Current Credit Status
-    report.append("📊 CURRENT CREDIT STATUS")
-    report.append("-" * 80)
     for name, credit in CREDITS.items():
         if credit["status"] == "Available":
             percent_used = ((credit["original"] - credit["remaining"]) / credit["original"]) * 100
-            report.append(f"  {name}:")
-            report.append(f"    Remaining: ${credit['remaining']:.2f} / ${credit['original']:.2f}")
-            report.append(f"    Used: {percent_used:.1f}%")
-            report.append("")
+            out.write(f"""  {name}:
+    Remaining: ${credit['remaining']:.2f} / ${credit['original']:.2f}
+    Used: {percent_used:.1f}%
+
+""")
     
-    report.append(f"  💵 TOTAL AVAILABLE: ${total_available:.2f}")
-    report.append(f"  📉 TOTAL USED THIS WEEK: ${total_used:.2f}")
-    report.append("")
+    out.write(f"""  💵 TOTAL AVAILABLE: ${total_available:.2f}
+  📉 TOTAL USED THIS WEEK: ${total_used:.2f}
+
+🎯 USAGE SCENARIOS & CREDIT LIFESPAN
+{DASH_LINE}
+
+""")
     
     # Usage Scenarios
-    report.append("🎯 USAGE SCENARIOS & CREDIT LIFESPAN")
-    report.append("-" * 80)
-    report.append("")
-    
-    # Scenario 1: Light Usage (Flash, no caching)
     scenarios = [
         {
             "name": "Light Usage (Flash, No Caching)",
@@ -179,48 +268,28 @@ def generate_report():
         }
     ]
     
-    for scenario in scenarios:
-        cost_per_request = calculate_cost_per_request(
-            scenario["model"],
-            scenario["avg_input"],
-            scenario["avg_output"],
-            scenario["caching"]
-        )
-        daily_cost = cost_per_request * scenario["requests_per_day"]
-        days_remaining = calculate_days_remaining(total_available, daily_cost)
-        requests_per_dollar = calculate_requests_per_dollar(
-            scenario["model"],
-            scenario["avg_input"],
-            scenario["avg_output"],
-            scenario["caching"]
+    costs = calculate_scenario_costs(scenarios, total_available)
+    
+    out.write("".join(
+        _SCENARIO_TMPL.format(
+            name=scenario["name"],
+            requests_per_day=scenario["requests_per_day"],
+            avg_input=scenario["avg_input"],
+            avg_output=scenario["avg_output"],
+            cost_per_request=costs["cost_per_request"][i],
+            daily_cost=costs["daily_cost"][i],
+            requests_per_dollar=costs["requests_per_dollar"][i],
+            lifespan=_format_lifespan(costs["days_remaining"][i]),
+            caching_note=_CACHING_NOTE if scenario["caching"] else "",
         )
-        
-        report.append(f"  📌 {scenario['name']}:")
-        report.append(f"     Requests/day: {scenario['requests_per_day']:,}")
-        report.append(f"     Avg tokens: {scenario['avg_input']:,} input + {scenario['avg_output']:,} output")
-        report.append(f"     Cost/request: ${cost_per_request:.6f}")
-        report.append(f"     Daily cost: ${daily_cost:.2f}")
-        report.append(f"     Requests per $1: {requests_per_dollar:,}")
-        
-        if days_remaining == float('inf'):
-            report.append(f"     ⏰ Credits will last: Forever (no usage)")
-        elif days_remaining > 365:
-            years = days_remaining / 365
-            report.append(f"     ⏰ Credits will last: {years:.1f} years ({days_remaining:.0f} days)")
-        elif days_remaining > 30:
-            months = days_remaining / 30
-            report.append(f"     ⏰ Credits will last: {months:.1f} months ({days_remaining:.0f} days)")
-        else:
-            report.append(f"     ⏰ Credits will last: {days_remaining:.1f} days")
-        
-        if scenario["caching"]:
-            report.append(f"     💡 Using caching: 90% savings on input tokens")
-        report.append("")
+        for i, scenario in enumerate(scenarios)
+    ))
     
     # Cost Breakdown
-    report.append("💵 COST BREAKDOWN BY MODEL")
-    report.append("-" * 80)
-    report.append("")
+    out.write(f"""💵 COST BREAKDOWN BY MODEL
+{DASH_LINE}
+
+""")
     
     # Example: 1M input + 500K output tokens
     example_input = 1_000_000
@@ -234,41 +303,44 @@ def generate_report():
         cost_no_cache = calculate_cost_per_request(model_key, example_input, example_output, False)
         cost_with_cache = calculate_cost_per_request(model_key, example_input, example_output, True) if model_key != "gemini_3_0_pro" else None
         
-        report.append(f"  {model_name} (1M input + 500K output tokens):")
-        report.append(f"    Without caching: ${cost_no_cache:.4f}")
+        out.write(f"""  {model_name} (1M input + 500K output tokens):
+    Without caching: ${cost_no_cache:.4f}
+""")
         if cost_with_cache:
             savings = ((cost_no_cache - cost_with_cache) / cost_no_cache) * 100
-            report.append(f"    With caching: ${cost_with_cache:.4f} (save {savings:.1f}%)")
-        report.append("")
+            out.write(f"    With caching: ${cost_with_cache:.4f} (save {savings:.1f}%)\n")
+        out.write("\n")
     
     # Recommendations
-    report.append("💡 RECOMMENDATIONS")
-    report.append("-" * 80)
-    report.append("")
-    report.append("  1. ✅ Use Gemini 2.5 Flash for 90%+ of requests (cost-efficient)")
-    report.append("  2. ✅ Enable caching for repeated queries (90% discount on input)")
-    report.append("  3. ✅ Reserve Pro models for complex tasks only")
-    report.append("  4. ✅ Monitor daily spend to track burn rate")
-    report.append("  5. ⚠️  Avoid Gemini 3.0 Pro unless absolutely necessary (2x cost)")
-    report.append("")
+    out.write(f"""💡 RECOMMENDATIONS
+{DASH_LINE}
+
+  1. ✅ Use Gemini 2.5 Flash for 90%+ of requests (cost-efficient)
+  2. ✅ Enable caching for repeated queries (90% discount on input)
+  3. ✅ Reserve Pro models for complex tasks only
+  4. ✅ Monitor daily spend to track burn rate
+  5. ⚠️  Avoid Gemini 3.0 Pro unless absolutely necessary (2x cost)
+
+""")
     
     # Weekly Burn Rate Analysis
     if total_used > 0:
-        report.append("📈 WEEKLY BURN RATE ANALYSIS")
-        report.append("-" * 80)
-        report.append(f"  Credits used this week: ${total_used:.2f}")
-        report.append(f"  Daily average: ${total_used / 7:.2f}")
-        report.append(f"  Projected monthly burn: ${(total_used / 7) * 30:.2f}")
+        out.write(f"""📈 WEEKLY BURN RATE ANALYSIS
+{DASH_LINE}
+  Credits used this week: ${total_used:.2f}
+  Daily average: ${total_used / 7:.2f}
+  Projected monthly burn: ${(total_used / 7) * 30:.2f}
+""")
         
         if total_used > 0:
             projected_days = calculate_days_remaining(total_available, total_used / 7)
             if projected_days < 365:
-                report.append(f"  ⏰ At current rate, credits will last: {projected_days:.1f} days")
-        report.append("")
+                out.write(f"  ⏰ At current rate, credits will last: {projected_days:.1f} days\n")
+        out.write("\n")
     
-    report.append("=" * 80)
+    out.write(EQ_LINE)
     
-    return "\n".join(report)
+    return out.getvalue()
 
 
 def main():
@@ -278,8 +350,7 @@ def main():
     # Save report
     report_file = Path("data/credit_burn_analysis.txt")
     report_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+    report_file.write_text(report, encoding='utf-8')
     
     print(f"\n💾 Report saved to: {report_file}")
 
@@ -8,9 +8,9 @@ Usage:
     python scripts/flash_image_comparison.py [--images N]
 """
 
+import io
 import sys
-import argparse
-from pathlib import Path
+from functools import lru_cache
 
 # Credit information
 CREDITS = {
@@ -26,6 +26,22 @@ CREDITS = {
 
 TOTAL_AVAILABLE = sum(c["remaining"] for c in CREDITS.values() if c["status"] == "Available")
 
+EQ_LINE = "=" * 80
+DASH_LINE = "-" * 80
+
+# Comparison table row; widths include the "$" so money cells pad to 12
+_ROW_TMPL = (
+    "  {medal} {rank}  | {description:<25.25} | ${cost_per_image:<11.4f} | "
+    "${total_cost:<11.2f} | {images_per_dollar:<12,.0f}\n"
+)
+# One block per daily-usage projection in the report
+_PROJECTION_TMPL = (
+    "  {name} ({images_per_day} images/day):\n"
+    "    Daily: ${daily:.2f}\n"
+    "    Weekly: ${weekly:.2f}\n"
+    "    Monthly: ${monthly:.2f}\n"
+)
+
 # Updated pricing - Gemini 2.5 Flash Image
 IMAGE_PRICING = {
     "imagen3": {
@@ -67,9 +83,18 @@ IMAGE_PRICING = {
     }
 }
 
+# Models ranked cheapest-first; total cost scales linearly so this never changes
+_SORTED_MODELS = tuple(sorted(IMAGE_PRICING, key=lambda m: IMAGE_PRICING[m]["price_per_image"]))
+
 
+@lru_cache(maxsize=None)
 def calculate_costs(num_images: int, model: str) -> dict:
-    """Calculate costs for image generation."""
+    """
+    Calculate costs for image generation.
+    
+    Results are memoized per (num_images, model); treat the returned dict
+    as read-only.
+    """
     
     if model not in IMAGE_PRICING:
         model = "imagen4"
@@ -94,141 +119,114 @@ def calculate_costs(num_images: int, model: str) -> dict:
 def generate_comparison_report(num_images: int = 300):
     """Generate comprehensive comparison report."""
     
-    report = []
-    report.append("=" * 80)
-    report.append("🎨 IMAGE GENERATION MODEL COMPARISON")
-    report.append("=" * 80)
-    report.append("")
-    
-    report.append("💰 CURRENT CREDIT STATUS")
-    report.append("-" * 80)
-    report.append(f"  Total Available: ${TOTAL_AVAILABLE:.2f}")
-    report.append("")
-    
-    # Cost Comparison Table
-    report.append(f"📊 COST COMPARISON FOR {num_images:,} IMAGES")
-    report.append("-" * 80)
-    report.append("")
-    
-    models = [
-        "imagen4_fast",
-        "gemini_2_5_flash_image",
-        "imagen3",
-        "imagen4",
-        "gemini3_pro_1k",
-        "gemini3_pro_4k"
-    ]
-    
-    results = []
-    for model in models:
-        costs = calculate_costs(num_images, model)
-        results.append(costs)
-    
-    # Sort by cost
-    results.sort(key=lambda x: x["total_cost"])
+    out = io.StringIO()
+    out.write(f"""{EQ_LINE}
+🎨 IMAGE GENERATION MODEL COMPARISON
+{EQ_LINE}
+
+💰 CURRENT CREDIT STATUS
+{DASH_LINE}
+  Total Available: ${TOTAL_AVAILABLE:.2f}
+
+📊 COST COMPARISON FOR {num_images:,} IMAGES
+{DASH_LINE}
+
+  Rank | Model                      | Cost/Image | Total Cost  | Images/$1
+  {"-" * 75}
+""")
     
-    report.append("  Rank | Model                      | Cost/Image | Total Cost  | Images/$1")
-    report.append("  " + "-" * 75)
+    # Cost Comparison Table (rank order is independent of num_images)
+    results = [calculate_costs(num_images, model) for model in _SORTED_MODELS]
     
     for i, result in enumerate(results, 1):
-        model_name = result["description"][:25].ljust(25)
-        cost_per = f"${result['cost_per_image']:.4f}".ljust(12)
-        total = f"${result['total_cost']:.2f}".ljust(12)
-        per_dollar = f"{result['images_per_dollar']:,.0f}".ljust(12)
         medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else "  "
-        report.append(f"  {medal} {i}  | {model_name} | {cost_per} | {total} | {per_dollar}")
-    
-    report.append("")
+        out.write(_ROW_TMPL.format_map({**result, "medal": medal, "rank": i}))
     
     # Detailed Analysis
-    report.append("💵 DETAILED ANALYSIS")
-    report.append("-" * 80)
-    report.append("")
-    
-    # Gemini 2.5 Flash Image
     flash_image = calculate_costs(num_images, "gemini_2_5_flash_image")
     imagen4 = calculate_costs(num_images, "imagen4")
     gemini3 = calculate_costs(num_images, "gemini3_pro_1k")
-    
-    report.append("  🆕 Gemini 2.5 Flash Image:")
-    report.append(f"    Cost: ${flash_image['total_cost']:.2f} ({flash_image['cost_per_image']:.4f}/image)")
-    report.append(f"    Capabilities: {flash_image['capabilities']}")
-    report.append(f"    Model ID: {IMAGE_PRICING['gemini_2_5_flash_image']['model_id']}")
-    report.append(f"    Tokens per 1K image: {IMAGE_PRICING['gemini_2_5_flash_image']['tokens_per_image_1k']}")
-    report.append("")
-    
-    report.append("  vs Imagen 4:")
     savings_vs_imagen = imagen4['total_cost'] - flash_image['total_cost']
-    report.append(f"    Savings: ${savings_vs_imagen:.2f} ({savings_vs_imagen / imagen4['total_cost'] * 100:.1f}%)")
-    report.append(f"    → {int(savings_vs_imagen / flash_image['cost_per_image']):,} more images possible")
-    report.append("")
-    
-    report.append("  vs Gemini 3 Pro:")
     savings_vs_gemini3 = gemini3['total_cost'] - flash_image['total_cost']
-    report.append(f"    Savings: ${savings_vs_gemini3:.2f} ({savings_vs_gemini3 / gemini3['total_cost'] * 100:.1f}%)")
-    report.append(f"    → {int(savings_vs_gemini3 / flash_image['cost_per_image']):,} more images possible")
-    report.append("")
     
-    # Key Advantages
-    report.append("✨ KEY ADVANTAGES OF GEMINI 2.5 FLASH IMAGE")
-    report.append("-" * 80)
-    report.append("")
-    report.append("  ✅ CHEAPER than Imagen 4 ($0.0387 vs $0.04)")
-    report.append("  ✅ 3.5x CHEAPER than Gemini 3 Pro ($0.0387 vs $0.134)")
-    report.append("  ✅ MULTIMODAL: Can take text + image input (unlike Imagen)")
-    report.append("  ✅ IMAGE UNDERSTANDING: Can analyze images, not just generate")
-    report.append("  ✅ FAST: Built on Gemini 2.5 Flash architecture")
-    report.append("  ✅ UP TO 10 IMAGES per prompt")
-    report.append("  ✅ MULTIPLE ASPECT RATIOS: 1:1, 16:9, 21:9, etc.")
-    report.append("")
+    out.write(f"""
+💵 DETAILED ANALYSIS
+{DASH_LINE}
+
+  🆕 Gemini 2.5 Flash Image:
+    Cost: ${flash_image['total_cost']:.2f} ({flash_image['cost_per_image']:.4f}/image)
+    Capabilities: {flash_image['capabilities']}
+    Model ID: {IMAGE_PRICING['gemini_2_5_flash_image']['model_id']}
+    Tokens per 1K image: {IMAGE_PRICING['gemini_2_5_flash_image']['tokens_per_image_1k']}
+
+  vs Imagen 4:
+    Savings: ${savings_vs_imagen:.2f} ({savings_vs_imagen / imagen4['total_cost'] * 100:.1f}%)
+    → {int(savings_vs_imagen / flash_image['cost_per_image']):,} more images possible
+
+  vs Gemini 3 Pro:
+    Savings: ${savings_vs_gemini3:.2f} ({savings_vs_gemini3 / gemini3['total_cost'] * 100:.1f}%)
+    → {int(savings_vs_gemini3 / flash_image['cost_per_image']):,} more images possible
+
+✨ KEY ADVANTAGES OF GEMINI 2.5 FLASH IMAGE
+{DASH_LINE}
+
+  ✅ CHEAPER than Imagen 4 ($0.0387 vs $0.04)
+  ✅ 3.5x CHEAPER than Gemini 3 Pro ($0.0387 vs $0.134)
+  ✅ MULTIMODAL: Can take text + image input (unlike Imagen)
+  ✅ IMAGE UNDERSTANDING: Can analyze images, not just generate
+  ✅ FAST: Built on Gemini 2.5 Flash architecture
+  ✅ UP TO 10 IMAGES per prompt
+  ✅ MULTIPLE ASPECT RATIOS: 1:1, 16:9, 21:9, etc.
+
+🚀 MAXIMUM IMAGES POSSIBLE WITH YOUR CREDITS
+{DASH_LINE}
+""")
     
     # Maximum Images Possible
-    report.append("🚀 MAXIMUM IMAGES POSSIBLE WITH YOUR CREDITS")
-    report.append("-" * 80)
-    
     for model in ["imagen4_fast", "gemini_2_5_flash_image", "imagen4", "gemini3_pro_1k"]:
         costs = calculate_costs(1, model)
         max_images = int(TOTAL_AVAILABLE / costs["cost_per_image"])
-        report.append(f"  {costs['description']}:")
-        report.append(f"    Maximum images: {max_images:,}")
-        report.append(f"    Cost per image: ${costs['cost_per_image']:.4f}")
-        report.append("")
+        out.write(f"""  {costs['description']}:
+    Maximum images: {max_images:,}
+    Cost per image: ${costs['cost_per_image']:.4f}
+
+""")
     
     # Your 300 Images Analysis
-    report.append("📊 YOUR 300 IMAGES ANALYSIS")
-    report.append("-" * 80)
+    out.write(f"📊 YOUR 300 IMAGES ANALYSIS\n{DASH_LINE}\n")
     
     for model in ["gemini_2_5_flash_image", "imagen4", "gemini3_pro_1k"]:
         costs = calculate_costs(300, model)
-        report.append(f"  {costs['description']}:")
-        report.append(f"    Total cost: ${costs['total_cost']:.2f}")
-        report.append(f"    Credits remaining: ${costs['credits_remaining']:.2f}")
-        report.append(f"    % of credits used: {costs['percent_used']:.2f}%")
-        report.append("")
+        out.write(f"""  {costs['description']}:
+    Total cost: ${costs['total_cost']:.2f}
+    Credits remaining: ${costs['credits_remaining']:.2f}
+    % of credits used: {costs['percent_used']:.2f}%
+
+""")
     
     # Recommendations
-    report.append("💡 RECOMMENDATIONS")
-    report.append("-" * 80)
-    report.append("")
-    report.append("  🥇 BEST CHOICE: Gemini 2.5 Flash Image")
-    report.append("     • Cheaper than Imagen")
-    report.append("     • Multimodal capabilities (text + image input)")
-    report.append("     • Image understanding + generation")
-    report.append("     • Perfect for your use case!")
-    report.append("")
-    report.append("  🥈 SECOND CHOICE: Imagen 4 Fast ($0.02/image)")
-    report.append("     • Cheapest option")
-    report.append("     • But no multimodal capabilities")
-    report.append("")
-    report.append("  ⚠️  AVOID: Gemini 3 Pro (unless you need 4K)")
-    report.append("     • 3.5x more expensive than Flash Image")
-    report.append("     • Only use if you need highest quality or 4K")
-    report.append("")
+    out.write(f"""💡 RECOMMENDATIONS
+{DASH_LINE}
+
+  🥇 BEST CHOICE: Gemini 2.5 Flash Image
+     • Cheaper than Imagen
+     • Multimodal capabilities (text + image input)
+     • Image understanding + generation
+     • Perfect for your use case!
+
+  🥈 SECOND CHOICE: Imagen 4 Fast ($0.02/image)
+     • Cheapest option
+     • But no multimodal capabilities
+
+  ⚠️  AVOID: Gemini 3 Pro (unless you need 4K)
+     • 3.5x more expensive than Flash Image
+     • Only use if you need highest quality or 4K
+
+📅 COST PROJECTIONS (Gemini 2.5 Flash Image)
+{DASH_LINE}
+""")
     
     # Cost Projections
-    report.append("📅 COST PROJECTIONS (Gemini 2.5 Flash Image)")
-    report.append("-" * 80)
-    
     flash_cost_per = flash_image['cost_per_image']
     scenarios = [
         {"name": "Light", "images_per_day": 50},
@@ -239,48 +237,80 @@ def generate_comparison_report(num_images: int = 300):
     
     for scenario in scenarios:
         daily_cost = scenario["images_per_day"] * flash_cost_per
-        weekly_cost = daily_cost * 7
-        monthly_cost = daily_cost * 30
         days_remaining = TOTAL_AVAILABLE / daily_cost if daily_cost > 0 else float('inf')
         
-        report.append(f"  {scenario['name']} ({scenario['images_per_day']} images/day):")
-        report.append(f"    Daily: ${daily_cost:.2f}")
-        report.append(f"    Weekly: ${weekly_cost:.2f}")
-        report.append(f"    Monthly: ${monthly_cost:.2f}")
+        out.write(_PROJECTION_TMPL.format(
+            name=scenario["name"],
+            images_per_day=scenario["images_per_day"],
+            daily=daily_cost,
+            weekly=daily_cost * 7,
+            monthly=daily_cost * 30,
+        ))
         
         if days_remaining != float('inf'):
             if days_remaining > 365:
-                report.append(f"    ⏰ Credits last: {days_remaining / 365:.1f} years")
+                out.write(f"    ⏰ Credits last: {days_remaining / 365:.1f} years\n")
             elif days_remaining > 30:
-                report.append(f"    ⏰ Credits last: {days_remaining / 30:.1f} months")
+                out.write(f"    ⏰ Credits last: {days_remaining / 30:.1f} months\n")
             else:
-                report.append(f"    ⏰ Credits last: {days_remaining:.1f} days")
-        report.append("")
+                out.write(f"    ⏰ Credits last: {days_remaining:.1f} days\n")
+        out.write("\n")
     
-    report.append("=" * 80)
+    out.write(EQ_LINE)
     
-    return "\n".join(report)
+    return out.getvalue()
+
+
+def _usage_error(message: str):
+    """Exit like argparse does on bad arguments (message on stderr, status 2)."""
+    print("usage: flash_image_comparison.py [--images N]", file=sys.stderr)
+    print(f"error: {message}", file=sys.stderr)
+    sys.exit(2)
+
+
+def _parse_images(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        _usage_error(f"argument --images: invalid int value: '{value}'")
+
+
+def parse_args(argv: list) -> int:
+    """
+    Parse the single --images flag.
+    
+    Hand-rolled instead of argparse: importing argparse costs more than
+    generating the whole report.
+    """
+    num_images = 300
+    args = iter(argv)
+    for arg in args:
+        if arg in ("-h", "--help"):
+            print(__doc__.strip())
+            sys.exit(0)
+        if arg == "--images":
+            value = next(args, None)
+            if value is None:
+                _usage_error("argument --images: expected one argument")
+            num_images = _parse_images(value)
+        elif arg.startswith("--images="):
+            num_images = _parse_images(arg.partition("=")[2])
+        else:
+            _usage_error(f"unrecognized arguments: {arg}")
+    return num_images
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Compare image generation models")
-    parser.add_argument(
-        "--images",
-        type=int,
-        default=300,
-        help="Number of images (default: 300)"
-    )
-    
-    args = parser.parse_args()
+    num_images = parse_args(sys.argv[1:])
     
-    report = generate_comparison_report(args.images)
+    report = generate_comparison_report(num_images)
     print(report)
     
-    # Save report
+    # Save report (pathlib imported after the report is already on screen)
+    from pathlib import Path
     report_file = Path("data/flash_image_comparison.txt")
     report_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+    report_file.write_text(report, encoding='utf-8')
     
     print(f"\n💾 Report saved to: {report_file}")
 
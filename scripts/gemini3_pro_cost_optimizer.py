@@ -8,9 +8,13 @@ Usage:
     python scripts/gemini3_pro_image_calculator.py [--images N] [--resolution 1k|2k|4k]
 """
 
+import io
 import sys
 import argparse
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import TextIO
 
 # Credit information
 CREDITS = {
@@ -26,6 +30,13 @@ CREDITS = {
 
 TOTAL_AVAILABLE = sum(c["remaining"] for c in CREDITS.values() if c["status"] == "Available")
 
+EQ_LINE = "=" * 80
+DASH_LINE = "-" * 80
+
+# Reports land in data/ relative to the working directory
+_REPORT_DIR = Path("data")
+_REPORT_FILE = _REPORT_DIR / "gemini3_pro_cost_optimization.txt"
+
 # Gemini 3 Pro pricing from official docs
 GEMINI3_PRO_PRICING = {
     "image_1k_2k": {
@@ -57,7 +68,64 @@ GEMINI3_PRO_PRICING = {
     }
 }
 
+# Read-only views: the calculators are memoized, so pricing must not change
+# at runtime
+GEMINI3_PRO_PRICING = MappingProxyType({
+    key: MappingProxyType(entry) for key, entry in GEMINI3_PRO_PRICING.items()
+})
+
+# Flat rates resolved once at import so cost calculations skip nested lookups
+_PRICE_1K2K_STD = GEMINI3_PRO_PRICING["image_1k_2k"]["price_per_image"]
+_PRICE_4K_STD = GEMINI3_PRO_PRICING["image_4k"]["price_per_image"]
+_PRICE_1K2K_BATCH = GEMINI3_PRO_PRICING["batch_api"]["image_1k_2k"]
+_PRICE_4K_BATCH = GEMINI3_PRO_PRICING["batch_api"]["image_4k"]
+_DESC_1K2K = GEMINI3_PRO_PRICING["image_1k_2k"]["description"]
+_DESC_4K = GEMINI3_PRO_PRICING["image_4k"]["description"]
+_IN_RATE_STD = GEMINI3_PRO_PRICING["input_text"]["price_per_1m_tokens"]
+_IN_RATE_LONG = GEMINI3_PRO_PRICING["input_text"]["price_per_1m_tokens_long"]
+_OUT_RATE_STD = GEMINI3_PRO_PRICING["output_text"]["price_per_1m_tokens"]
+_OUT_RATE_LONG = GEMINI3_PRO_PRICING["output_text"]["price_per_1m_tokens_long"]
+_LONG_CONTEXT_THRESHOLD = 200_000
+
+# Report block templates, formatted once per row
+_RESOLUTION_TMPL = (
+    "  {res} Resolution:\n"
+    "    Standard API: ${standard:.2f}\n"
+    "    Batch API: ${batch:.2f}\n"
+    "    Savings: ${savings:.2f}\n"
+    "    Credits remaining: ${remaining:.2f}\n"
+    "\n"
+)
+_MAX_IMAGES_TMPL = (
+    "  {res} - {api_type}:\n"
+    "    Maximum images: {max_images:,}\n"
+    "    Cost per image: ${unit_price:.4f}\n"
+    "\n"
+)
+_SCENARIO_TMPL = (
+    "  {name} ({images_per_day} images/day, {res}, Batch API):\n"
+    "    Daily cost: ${daily:.2f}\n"
+    "    Weekly cost: ${weekly:.2f}\n"
+    "    Monthly cost: ${monthly:.2f}\n"
+)
+
 
+def image_unit_price(resolution: str = "1k", use_batch: bool = False) -> float:
+    """Price of a single generated image at the given resolution/API tier."""
+    if resolution == "4k":
+        return _PRICE_4K_BATCH if use_batch else _PRICE_4K_STD
+    return _PRICE_1K2K_BATCH if use_batch else _PRICE_1K2K_STD
+
+
+# Per-image price for every (resolution, use_batch) pair, for image-only totals
+_UNIT_PRICES = {
+    (res, use_batch): image_unit_price(res, use_batch)
+    for res in ("1k", "2k", "4k")
+    for use_batch in (False, True)
+}
+
+
+@lru_cache(maxsize=128)
 def calculate_gemini3_pro_costs(
     num_images: int,
     resolution: str = "1k",
@@ -65,21 +133,16 @@ def calculate_gemini3_pro_costs(
     avg_input_tokens: int = 0,
     avg_output_tokens: int = 0
 ) -> dict:
-    """Calculate total costs for Gemini 3 Pro image generation."""
+    """
+    Calculate total costs for Gemini 3 Pro image generation.
+    
+    Results are memoized per argument tuple; treat the returned dict as
+    read-only.
+    """
     
     # Image generation cost
-    if resolution == "4k":
-        if use_batch:
-            image_cost_per = GEMINI3_PRO_PRICING["batch_api"]["image_4k"]
-        else:
-            image_cost_per = GEMINI3_PRO_PRICING["image_4k"]["price_per_image"]
-        image_desc = GEMINI3_PRO_PRICING["image_4k"]["description"]
-    else:
-        if use_batch:
-            image_cost_per = GEMINI3_PRO_PRICING["batch_api"]["image_1k_2k"]
-        else:
-            image_cost_per = GEMINI3_PRO_PRICING["image_1k_2k"]["price_per_image"]
-        image_desc = GEMINI3_PRO_PRICING["image_1k_2k"]["description"]
+    image_cost_per = image_unit_price(resolution, use_batch)
+    image_desc = _DESC_4K if resolution == "4k" else _DESC_1K2K
     
     image_total_cost = num_images * image_cost_per
     
@@ -87,22 +150,15 @@ def calculate_gemini3_pro_costs(
     input_cost = 0.0
     output_cost = 0.0
     
+    # Long context pricing applies to both input and output rates
+    long_context = avg_input_tokens > _LONG_CONTEXT_THRESHOLD
+    
     if avg_input_tokens > 0:
-        # Determine if long context pricing applies
-        if avg_input_tokens > 200_000:
-            input_rate = GEMINI3_PRO_PRICING["input_text"]["price_per_1m_tokens_long"]
-        else:
-            input_rate = GEMINI3_PRO_PRICING["input_text"]["price_per_1m_tokens"]
-        
+        input_rate = _IN_RATE_LONG if long_context else _IN_RATE_STD
         input_cost = (avg_input_tokens / 1_000_000) * input_rate * num_images
     
     if avg_output_tokens > 0:
-        # Output pricing depends on input context length
-        if avg_input_tokens > 200_000:
-            output_rate = GEMINI3_PRO_PRICING["output_text"]["price_per_1m_tokens_long"]
-        else:
-            output_rate = GEMINI3_PRO_PRICING["output_text"]["price_per_1m_tokens"]
-        
+        output_rate = _OUT_RATE_LONG if long_context else _OUT_RATE_STD
         output_cost = (avg_output_tokens / 1_000_000) * output_rate * num_images
     
     total_cost = image_total_cost + input_cost + output_cost
@@ -112,178 +168,247 @@ def calculate_gemini3_pro_costs(
         "resolution": resolution,
         "use_batch": use_batch,
         "image_cost_per": image_cost_per,
-        "image_total_cost": round(image_total_cost, 2),
-        "input_cost": round(input_cost, 2),
-        "output_cost": round(output_cost, 2),
-        "total_cost": round(total_cost, 2),
+        "image_total_cost": image_total_cost,
+        "input_cost": input_cost,
+        "output_cost": output_cost,
+        "total_cost": total_cost,
         "description": image_desc,
-        "credits_remaining": round(TOTAL_AVAILABLE - total_cost, 2),
-        "percent_used": round((total_cost / TOTAL_AVAILABLE) * 100, 2)
+        "credits_remaining": TOTAL_AVAILABLE - total_cost,
+        "percent_used": (total_cost / TOTAL_AVAILABLE) * 100
     }
 
 
-def generate_optimization_report(num_images: int = 300, resolution: str = "1k"):
-    """Generate cost optimization report."""
+class _Tee:
+    """Write-only text stream that forwards every write to several streams."""
+    
+    def __init__(self, *streams: TextIO):
+        self.streams = streams
     
-    report = []
-    report.append("=" * 80)
-    report.append("🎨 GEMINI 3 PRO IMAGE GENERATION - COST OPTIMIZATION GUIDE")
-    report.append("=" * 80)
-    report.append("")
+    def write(self, text: str) -> int:
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+
+# Image-only usage scenarios projected against the remaining credits
+_SCENARIOS = (
+    {"name": "Light Usage", "images_per_day": 50, "resolution": "1k", "batch": True},
+    {"name": "Moderate Usage", "images_per_day": 100, "resolution": "1k", "batch": True},
+    {"name": "Heavy Usage", "images_per_day": 200, "resolution": "1k", "batch": True},
+    {"name": "Heavy Usage (4K)", "images_per_day": 100, "resolution": "4k", "batch": True},
+)
+
+
+@lru_cache(maxsize=128)
+def compute_optimization(num_images: int = 300, resolution: str = "1k") -> dict:
+    """
+    Compute every number shown in the optimization report.
     
-    report.append("💰 CURRENT CREDIT STATUS")
-    report.append("-" * 80)
-    report.append(f"  Total Available: ${TOTAL_AVAILABLE:.2f}")
-    report.append("")
+    Returns plain floats/ints/strings only, so the result can be rendered,
+    serialized to JSON or inspected directly. Memoized per argument tuple;
+    treat the returned dict as read-only.
+    """
     
     # Standard vs Batch API
-    report.append(f"📊 COST COMPARISON FOR {num_images:,} IMAGES ({resolution.upper()})")
-    report.append("-" * 80)
-    report.append("")
-    
     standard = calculate_gemini3_pro_costs(num_images, resolution, use_batch=False)
     batch = calculate_gemini3_pro_costs(num_images, resolution, use_batch=True)
     
     savings = standard["total_cost"] - batch["total_cost"]
     savings_pct = (savings / standard["total_cost"]) * 100 if standard["total_cost"] > 0 else 0
     
-    report.append("  Standard API:")
-    report.append(f"    Cost per image: ${standard['image_cost_per']:.4f}")
-    report.append(f"    Total cost: ${standard['total_cost']:.2f}")
-    report.append("")
+    # Your 300 Images Analysis
+    resolutions_300 = []
+    for res in ["1k", "2k", "4k"]:
+        standard_total = 300 * _UNIT_PRICES[(res, False)]
+        batch_total = 300 * _UNIT_PRICES[(res, True)]
+        resolutions_300.append({
+            "res": res.upper(),
+            "standard": standard_total,
+            "batch": batch_total,
+            "savings": standard_total - batch_total,
+            "remaining": TOTAL_AVAILABLE - standard_total,
+        })
     
-    report.append("  Batch API (50% discount):")
-    report.append(f"    Cost per image: ${batch['image_cost_per']:.4f}")
-    report.append(f"    Total cost: ${batch['total_cost']:.2f}")
-    report.append(f"    💰 Savings: ${savings:.2f} ({savings_pct:.1f}%)")
-    report.append(f"    → You could generate {int(savings / standard['image_cost_per']):,} more images!")
-    report.append("")
+    # Maximum Images Possible
+    max_images = []
+    for res in ["1k", "4k"]:
+        for use_batch in [False, True]:
+            unit_price = image_unit_price(res, use_batch)
+            max_images.append({
+                "res": res.upper(),
+                "api_type": "Batch API" if use_batch else "Standard API",
+                "max_images": int(TOTAL_AVAILABLE / unit_price),
+                "unit_price": unit_price,
+            })
     
-    # Your 300 Images Analysis
-    report.append("📈 YOUR 300 IMAGES ANALYSIS")
-    report.append("-" * 80)
+    standard_300 = calculate_gemini3_pro_costs(300, resolution, False)
+    batch_300 = calculate_gemini3_pro_costs(300, resolution, True)
     
-    for res in ["1k", "2k", "4k"]:
-        costs_standard = calculate_gemini3_pro_costs(300, res, use_batch=False)
-        costs_batch = calculate_gemini3_pro_costs(300, res, use_batch=True)
+    # Projected Usage Scenarios
+    scenarios = []
+    for scenario in _SCENARIOS:
+        # Image-only scenarios: daily cost is just volume times unit price
+        unit_price = _UNIT_PRICES[(scenario["resolution"], scenario["batch"])]
+        daily_cost = scenario["images_per_day"] * unit_price
         
-        report.append(f"  {res.upper()} Resolution:")
-        report.append(f"    Standard API: ${costs_standard['total_cost']:.2f}")
-        report.append(f"    Batch API: ${costs_batch['total_cost']:.2f}")
-        report.append(f"    Savings: ${costs_standard['total_cost'] - costs_batch['total_cost']:.2f}")
-        report.append(f"    Credits remaining: ${costs_standard['credits_remaining']:.2f}")
-        report.append("")
+        scenarios.append({
+            "name": scenario["name"],
+            "images_per_day": scenario["images_per_day"],
+            "res": scenario["resolution"].upper(),
+            "daily": daily_cost,
+            "weekly": daily_cost * 7,
+            "monthly": daily_cost * 30,
+            # None when the scenario is free and credits never run out
+            "days_remaining": TOTAL_AVAILABLE / daily_cost if daily_cost > 0 else None,
+        })
+    
+    # Realistic Budget Planning
+    remaining_after_300 = TOTAL_AVAILABLE - batch_300["total_cost"]
+    max_additional = int(remaining_after_300 / image_unit_price(resolution, True))
+    
+    return {
+        "num_images": num_images,
+        "resolution": resolution,
+        "total_available": TOTAL_AVAILABLE,
+        "standard": standard,
+        "batch": batch,
+        "savings": savings,
+        "savings_pct": savings_pct,
+        # round() before int(): e.g. 59.8 / 0.04 evaluates to 1494.999...
+        "extra_images": int(round(savings / standard["image_cost_per"], 9)),
+        "resolutions_300": resolutions_300,
+        "max_images": max_images,
+        "batch_savings_300": standard_300["total_cost"] - batch_300["total_cost"],
+        "scenarios": scenarios,
+        "remaining_after_300": remaining_after_300,
+        "max_additional": max_additional,
+    }
+
+
+def render_optimization_report(out: TextIO, data: dict) -> None:
+    """Write a report computed by compute_optimization to a text stream."""
+    
+    num_images = data["num_images"]
+    resolution = data["resolution"]
+    standard = data["standard"]
+    batch = data["batch"]
+    
+    out.write(f"{EQ_LINE}\n")
+    out.write("🎨 GEMINI 3 PRO IMAGE GENERATION - COST OPTIMIZATION GUIDE\n")
+    out.write(f"{EQ_LINE}\n")
+    out.write("\n")
+    
+    out.write("💰 CURRENT CREDIT STATUS\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write(f"  Total Available: ${data['total_available']:.2f}\n")
+    out.write("\n")
+    
+    # Standard vs Batch API
+    out.write(f"📊 COST COMPARISON FOR {num_images:,} IMAGES ({resolution.upper()})\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
+    
+    out.write("  Standard API:\n")
+    out.write(f"    Cost per image: ${standard['image_cost_per']:.4f}\n")
+    out.write(f"    Total cost: ${standard['total_cost']:.2f}\n")
+    out.write("\n")
+    
+    out.write("  Batch API (50% discount):\n")
+    out.write(f"    Cost per image: ${batch['image_cost_per']:.4f}\n")
+    out.write(f"    Total cost: ${batch['total_cost']:.2f}\n")
+    out.write(f"    💰 Savings: ${data['savings']:.2f} ({data['savings_pct']:.1f}%)\n")
+    out.write(f"    → You could generate {data['extra_images']:,} more images!\n")
+    out.write("\n")
+    
+    # Your 300 Images Analysis
+    out.write("📈 YOUR 300 IMAGES ANALYSIS\n")
+    out.write(f"{DASH_LINE}\n")
+    
+    for row in data["resolutions_300"]:
+        out.write(_RESOLUTION_TMPL.format_map(row))
     
     # Maximum Images Possible
-    report.append("🚀 MAXIMUM IMAGES POSSIBLE WITH YOUR CREDITS")
-    report.append("-" * 80)
+    out.write("🚀 MAXIMUM IMAGES POSSIBLE WITH YOUR CREDITS\n")
+    out.write(f"{DASH_LINE}\n")
     
-    for res in ["1k", "4k"]:
-        for use_batch in [False, True]:
-            costs = calculate_gemini3_pro_costs(1, res, use_batch=use_batch)
-            max_images = int(TOTAL_AVAILABLE / costs["image_cost_per"])
-            api_type = "Batch API" if use_batch else "Standard API"
-            report.append(f"  {res.upper()} - {api_type}:")
-            report.append(f"    Maximum images: {max_images:,}")
-            report.append(f"    Cost per image: ${costs['image_cost_per']:.4f}")
-            report.append("")
+    for row in data["max_images"]:
+        out.write(_MAX_IMAGES_TMPL.format_map(row))
     
     # Cost Optimization Strategies
-    report.append("💡 COST OPTIMIZATION STRATEGIES")
-    report.append("-" * 80)
-    report.append("")
-    
-    report.append("  1. ✅ USE BATCH API WHENEVER POSSIBLE")
-    report.append("     • 50% discount on image generation")
-    report.append("     • Best for non-real-time generation")
-    report.append("     • Your 300 images: Save ${:.2f}".format(
-        calculate_gemini3_pro_costs(300, resolution, False)["total_cost"] - 
-        calculate_gemini3_pro_costs(300, resolution, True)["total_cost"]
-    ))
-    report.append("")
-    
-    report.append("  2. ✅ USE 1K/2K RESOLUTION WHEN POSSIBLE")
-    report.append("     • 1K/2K: $0.134/image (standard) or $0.067/image (batch)")
-    report.append("     • 4K: $0.24/image (standard) or $0.12/image (batch)")
-    report.append("     • 4K is 1.8x more expensive")
-    report.append("")
-    
-    report.append("  3. ✅ MINIMIZE INPUT TOKENS")
-    report.append("     • Keep prompts concise")
-    report.append("     • Avoid long context windows (>200K tokens triggers higher rates)")
-    report.append("     • Input: $2/1M tokens (standard) or $4/1M tokens (long context)")
-    report.append("")
-    
-    report.append("  4. ✅ MINIMIZE TEXT OUTPUT")
-    report.append("     • If you only need images, avoid text responses")
-    report.append("     • Output: $12/1M tokens (standard) or $18/1M tokens (long context)")
-    report.append("")
-    
-    report.append("  5. ✅ BATCH YOUR REQUESTS")
-    report.append("     • Group multiple image generations together")
-    report.append("     • Use async/batch processing when possible")
-    report.append("     • Reduces overhead and enables batch API discounts")
-    report.append("")
+    out.write("💡 COST OPTIMIZATION STRATEGIES\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
+    
+    out.write("  1. ✅ USE BATCH API WHENEVER POSSIBLE\n")
+    out.write("     • 50% discount on image generation\n")
+    out.write("     • Best for non-real-time generation\n")
+    out.write(f"     • Your 300 images: Save ${data['batch_savings_300']:.2f}\n")
+    out.write("\n")
+    out.write("  2. ✅ USE 1K/2K RESOLUTION WHEN POSSIBLE\n")
+    out.write("     • 1K/2K: $0.134/image (standard) or $0.067/image (batch)\n")
+    out.write("     • 4K: $0.24/image (standard) or $0.12/image (batch)\n")
+    out.write("     • 4K is 1.8x more expensive\n")
+    out.write("\n")
+    
+    out.write("  3. ✅ MINIMIZE INPUT TOKENS\n")
+    out.write("     • Keep prompts concise\n")
+    out.write("     • Avoid long context windows (>200K tokens triggers higher rates)\n")
+    out.write("     • Input: $2/1M tokens (standard) or $4/1M tokens (long context)\n")
+    out.write("\n")
+    
+    out.write("  4. ✅ MINIMIZE TEXT OUTPUT\n")
+    out.write("     • If you only need images, avoid text responses\n")
+    out.write("     • Output: $12/1M tokens (standard) or $18/1M tokens (long context)\n")
+    out.write("\n")
+    
+    out.write("  5. ✅ BATCH YOUR REQUESTS\n")
+    out.write("     • Group multiple image generations together\n")
+    out.write("     • Use async/batch processing when possible\n")
+    out.write("     • Reduces overhead and enables batch API discounts\n")
+    out.write("\n")
     
     # Projected Usage Scenarios
-    report.append("📅 PROJECTED USAGE SCENARIOS")
-    report.append("-" * 80)
-    report.append("")
-    
-    scenarios = [
-        {"name": "Light Usage", "images_per_day": 50, "resolution": "1k", "batch": True},
-        {"name": "Moderate Usage", "images_per_day": 100, "resolution": "1k", "batch": True},
-        {"name": "Heavy Usage", "images_per_day": 200, "resolution": "1k", "batch": True},
-        {"name": "Heavy Usage (4K)", "images_per_day": 100, "resolution": "4k", "batch": True},
-    ]
-    
-    for scenario in scenarios:
-        daily_cost = calculate_gemini3_pro_costs(
-            scenario["images_per_day"],
-            scenario["resolution"],
-            scenario["batch"]
-        )["total_cost"]
-        
-        weekly_cost = daily_cost * 7
-        monthly_cost = daily_cost * 30
-        days_remaining = TOTAL_AVAILABLE / daily_cost if daily_cost > 0 else float('inf')
-        
-        report.append(f"  {scenario['name']} ({scenario['images_per_day']} images/day, {scenario['resolution'].upper()}, Batch API):")
-        report.append(f"    Daily cost: ${daily_cost:.2f}")
-        report.append(f"    Weekly cost: ${weekly_cost:.2f}")
-        report.append(f"    Monthly cost: ${monthly_cost:.2f}")
+    out.write("📅 PROJECTED USAGE SCENARIOS\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
+    
+    for scenario in data["scenarios"]:
+        out.write(_SCENARIO_TMPL.format_map(scenario))
         
-        if days_remaining != float('inf'):
+        days_remaining = scenario["days_remaining"]
+        if days_remaining is not None:
             if days_remaining > 365:
-                report.append(f"    ⏰ Credits last: {days_remaining / 365:.1f} years ({days_remaining:.0f} days)")
+                out.write(f"    ⏰ Credits last: {days_remaining / 365:.1f} years ({days_remaining:.0f} days)\n")
             elif days_remaining > 30:
-                report.append(f"    ⏰ Credits last: {days_remaining / 30:.1f} months ({days_remaining:.0f} days)")
+                out.write(f"    ⏰ Credits last: {days_remaining / 30:.1f} months ({days_remaining:.0f} days)\n")
             else:
-                report.append(f"    ⏰ Credits last: {days_remaining:.1f} days")
-        report.append("")
+                out.write(f"    ⏰ Credits last: {days_remaining:.1f} days\n")
+        out.write("\n")
     
     # Realistic Budget Planning
-    report.append("💰 REALISTIC BUDGET PLANNING")
-    report.append("-" * 80)
-    report.append("")
-    
-    # Calculate what they can do with remaining credits
-    remaining_after_300 = TOTAL_AVAILABLE - calculate_gemini3_pro_costs(300, resolution, True)["total_cost"]
-    
-    report.append(f"  After generating 300 images ({resolution.upper()}, Batch API):")
-    report.append(f"    Credits remaining: ${remaining_after_300:.2f}")
-    
-    # How many more images can they generate?
-    cost_per_image_batch = calculate_gemini3_pro_costs(1, resolution, True)["image_cost_per"]
-    max_additional = int(remaining_after_300 / cost_per_image_batch)
+    out.write("💰 REALISTIC BUDGET PLANNING\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
     
-    report.append(f"    Can generate {max_additional:,} more images")
-    report.append(f"    Total possible: {300 + max_additional:,} images")
-    report.append("")
+    out.write(f"  After generating 300 images ({resolution.upper()}, Batch API):\n")
+    out.write(f"    Credits remaining: ${data['remaining_after_300']:.2f}\n")
+    out.write(f"    Can generate {data['max_additional']:,} more images\n")
+    out.write(f"    Total possible: {300 + data['max_additional']:,} images\n")
+    out.write("\n")
     
-    report.append("=" * 80)
-    
-    return "\n".join(report)
+    out.write(EQ_LINE)
+
+
+def write_optimization_report(out: TextIO, num_images: int = 300, resolution: str = "1k") -> None:
+    """Write the cost optimization report to a text stream."""
+    render_optimization_report(out, compute_optimization(num_images, resolution))
+
+
+def generate_optimization_report(num_images: int = 300, resolution: str = "1k"):
+    """Generate cost optimization report."""
+    out = io.StringIO()
+    write_optimization_report(out, num_images, resolution)
+    return out.getvalue()
 
 
 def main():
@@ -304,14 +429,13 @@ def main():
     
     args = parser.parse_args()
     
-    report = generate_optimization_report(args.images, args.resolution)
-    print(report)
-    
-    # Save report
-    report_file = Path("data/gemini3_pro_cost_optimization.txt")
-    report_file.parent.mkdir(parents=True, exist_ok=True)
+    # Stream the report to the terminal and the file in one pass
+    report_file = _REPORT_FILE
+    if not _REPORT_DIR.is_dir():
+        _REPORT_DIR.mkdir(parents=True, exist_ok=True)
     with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+        write_optimization_report(_Tee(sys.stdout, f), args.images, args.resolution)
+    print()
     
     print(f"\n💾 Report saved to: {report_file}")
 
@@ -8,9 +8,13 @@ Usage:
     python scripts/gemini3_pro_image_calculator.py [--images N] [--resolution 1k|2k|4k]
 """
 
+import io
 import sys
 import argparse
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import TextIO
 
 # Credit information
 CREDITS = {
@@ -26,6 +30,34 @@ CREDITS = {
 
 TOTAL_AVAILABLE = sum(c["remaining"] for c in CREDITS.values() if c["status"] == "Available")
 
+EQ_LINE = "=" * 80
+DASH_LINE = "-" * 80
+
+# Reports land in data/ relative to the working directory
+_REPORT_DIR = Path("data")
+_REPORT_FILE = _REPORT_DIR / "gemini3_pro_image_comparison.txt"
+
+# Comparison table row; widths include the "$" so money cells pad to 12
+_ROW_TMPL = (
+    "  {description:<30.30} | ${cost_per_image:<11.4f} | "
+    "${total_cost:<11.2f} | {images_per_dollar:<12,.0f}\n"
+)
+
+# Report block templates, formatted once per model
+_MAX_IMAGES_TMPL = (
+    "  {description}:\n"
+    "    Maximum images: {max_images:,}\n"
+    "    Cost per image: ${unit_price:.4f}\n"
+    "\n"
+)
+_USAGE_300_TMPL = (
+    "  {description}:\n"
+    "    Total cost: ${total_cost:.2f}\n"
+    "    Credits remaining: ${credits_remaining_after:.2f}\n"
+    "    % of credits used: {percent_of_credits_used:.2f}%\n"
+    "\n"
+)
+
 # Updated pricing from official docs
 IMAGE_PRICING = {
     "imagen3": {
@@ -68,9 +100,33 @@ IMAGE_PRICING = {
     }
 }
 
+# Read-only views: the calculators are memoized, so pricing must not change
+# at runtime
+IMAGE_PRICING = MappingProxyType({
+    key: MappingProxyType(entry) for key, entry in IMAGE_PRICING.items()
+})
+
+# Models in the comparison table, with unit prices resolved once at import
+_COMPARISON_MODELS = (
+    "imagen4_fast",
+    "imagen3",
+    "imagen4",
+    "imagen4_ultra",
+    "gemini3_pro_1k",
+    "gemini3_pro_2k",
+    "gemini3_pro_4k"
+)
+_COMPARISON_PRICES = tuple(IMAGE_PRICING[m]["price_per_image"] for m in _COMPARISON_MODELS)
+
 
+@lru_cache(maxsize=128)
 def calculate_image_costs(num_images: int, model: str = "imagen3") -> dict:
-    """Calculate costs for image generation."""
+    """
+    Calculate costs for image generation.
+    
+    Results are memoized per (num_images, model); treat the returned dict
+    as read-only.
+    """
     
     if model not in IMAGE_PRICING:
         model = "imagen3"
@@ -83,155 +139,209 @@ def calculate_image_costs(num_images: int, model: str = "imagen3") -> dict:
         "model": model,
         "num_images": num_images,
         "cost_per_image": cost_per_image,
-        "total_cost": round(total_cost, 2),
-        "images_per_dollar": round(1.0 / cost_per_image, 2) if cost_per_image > 0 else 0,
-        "credits_remaining_after": round(TOTAL_AVAILABLE - total_cost, 2),
-        "percent_of_credits_used": round((total_cost / TOTAL_AVAILABLE) * 100, 2) if TOTAL_AVAILABLE > 0 else 0,
+        "total_cost": total_cost,
+        "images_per_dollar": 1.0 / cost_per_image if cost_per_image > 0 else 0,
+        "credits_remaining_after": TOTAL_AVAILABLE - total_cost,
+        "percent_of_credits_used": (total_cost / TOTAL_AVAILABLE) * 100 if TOTAL_AVAILABLE > 0 else 0,
         "description": pricing["description"],
         "resolution": pricing.get("resolution", "N/A")
     }
 
 
-def generate_comparison_report(num_images: int = 300):
-    """Generate comparison report for different image generation models."""
+class _Tee:
+    """Write-only text stream that forwards every write to several streams."""
+    
+    def __init__(self, *streams: TextIO):
+        self.streams = streams
+    
+    def write(self, text: str) -> int:
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+
+@lru_cache(maxsize=128)
+def compute_comparison(num_images: int = 300) -> dict:
+    """
+    Compute every number shown in the comparison report.
+    
+    Returns plain floats/ints/strings only, so the result can be rendered,
+    serialized to JSON or inspected directly. Memoized per num_images;
+    treat the returned dict as read-only.
+    """
+    
+    # The table only needs totals, so sort on price * count directly
+    # instead of building a full cost dict per model
+    totals = [price * num_images for price in _COMPARISON_PRICES]
+    order = sorted(range(len(totals)), key=totals.__getitem__)
+    
+    models = []
+    for i in order:
+        model = _COMPARISON_MODELS[i]
+        price = _COMPARISON_PRICES[i]
+        models.append({
+            "model": model,
+            "description": IMAGE_PRICING[model]["description"],
+            "cost_per_image": price,
+            "total_cost": totals[i],
+            "images_per_dollar": 1.0 / price if price > 0 else 0,
+        })
+    
+    # Imagen vs Gemini 3 Pro
+    details = {
+        model: calculate_image_costs(num_images, model)
+        for model in ["imagen4", "gemini3_pro_1k", "gemini3_pro_4k"]
+    }
+    imagen_cost = details["imagen4"]
+    cost_diffs = {
+        model: details[model]["total_cost"] - imagen_cost["total_cost"]
+        for model in ["gemini3_pro_1k", "gemini3_pro_4k"]
+    }
+    
+    return {
+        "num_images": num_images,
+        "total_available": TOTAL_AVAILABLE,
+        "models": models,
+        "unit_prices": dict(zip(_COMPARISON_MODELS, _COMPARISON_PRICES)),
+        "details": details,
+        "cost_diffs": cost_diffs,
+        "max_images": {
+            model: int(TOTAL_AVAILABLE / IMAGE_PRICING[model]["price_per_image"])
+            for model in ["imagen4_fast", "imagen4", "gemini3_pro_1k", "gemini3_pro_4k"]
+        },
+        "usage_300": {
+            model: calculate_image_costs(300, model)
+            for model in ["imagen4", "gemini3_pro_1k", "gemini3_pro_4k"]
+        },
+    }
+
+
+def render_comparison_report(out: TextIO, data: dict) -> None:
+    """Write a report computed by compute_comparison to a text stream."""
+    
+    num_images = data["num_images"]
+    total_available = data["total_available"]
     
-    report = []
-    report.append("=" * 80)
-    report.append("🎨 IMAGE GENERATION COST COMPARISON")
-    report.append("=" * 80)
-    report.append("")
+    out.write(f"{EQ_LINE}\n")
+    out.write("🎨 IMAGE GENERATION COST COMPARISON\n")
+    out.write(f"{EQ_LINE}\n")
+    out.write("\n")
     
     # Current Credits
-    report.append("💰 CURRENT CREDIT STATUS")
-    report.append("-" * 80)
-    report.append(f"  Total Available: ${TOTAL_AVAILABLE:.2f}")
-    report.append("")
+    out.write("💰 CURRENT CREDIT STATUS\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write(f"  Total Available: ${total_available:.2f}\n")
+    out.write("\n")
     
     # Pricing Comparison
-    report.append(f"📊 COST COMPARISON FOR {num_images:,} IMAGES")
-    report.append("-" * 80)
-    report.append("")
-    
-    models_to_compare = [
-        "imagen4_fast",
-        "imagen3",
-        "imagen4",
-        "imagen4_ultra",
-        "gemini3_pro_1k",
-        "gemini3_pro_2k",
-        "gemini3_pro_4k"
-    ]
-    
-    results = []
-    for model in models_to_compare:
-        costs = calculate_image_costs(num_images, model)
-        results.append(costs)
-    
-    # Sort by cost
-    results.sort(key=lambda x: x["total_cost"])
-    
-    report.append("  Model                          | Cost/Image | Total Cost  | Images/$1")
-    report.append("  " + "-" * 70)
-    
-    for result in results:
-        model_name = result["description"][:30].ljust(30)
-        cost_per = f"${result['cost_per_image']:.4f}".ljust(12)
-        total = f"${result['total_cost']:.2f}".ljust(12)
-        per_dollar = f"{result['images_per_dollar']:,.0f}".ljust(12)
-        report.append(f"  {model_name} | {cost_per} | {total} | {per_dollar}")
-    
-    report.append("")
+    out.write(f"📊 COST COMPARISON FOR {num_images:,} IMAGES\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
+    
+    out.write("  Model                          | Cost/Image | Total Cost  | Images/$1\n")
+    out.write("  " + "-" * 70 + "\n")
+    
+    for result in data["models"]:
+        out.write(_ROW_TMPL.format_map(result))
+    
+    out.write("\n")
     
     # Detailed Analysis
-    report.append("💵 DETAILED ANALYSIS")
-    report.append("-" * 80)
-    report.append("")
+    out.write("💵 DETAILED ANALYSIS\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
     
     # Imagen vs Gemini 3 Pro
-    imagen_cost = calculate_image_costs(num_images, "imagen4")
-    gemini3_1k_cost = calculate_image_costs(num_images, "gemini3_pro_1k")
-    gemini3_4k_cost = calculate_image_costs(num_images, "gemini3_pro_4k")
-    
-    report.append(f"  Imagen 4 ({num_images:,} images):")
-    report.append(f"    Cost: ${imagen_cost['total_cost']:.2f}")
-    report.append(f"    Cost per image: ${imagen_cost['cost_per_image']:.4f}")
-    report.append("")
-    
-    report.append(f"  Gemini 3 Pro 1K/2K ({num_images:,} images):")
-    report.append(f"    Cost: ${gemini3_1k_cost['total_cost']:.2f}")
-    report.append(f"    Cost per image: ${gemini3_1k_cost['cost_per_image']:.4f}")
-    report.append(f"    Tokens per image: {gemini3_1k_cost.get('tokens_per_image', 'N/A')}")
-    report.append(f"    ⚠️  {gemini3_1k_cost['cost_per_image'] / imagen_cost['cost_per_image']:.1f}x more expensive than Imagen")
-    report.append("")
-    
-    report.append(f"  Gemini 3 Pro 4K ({num_images:,} images):")
-    report.append(f"    Cost: ${gemini3_4k_cost['total_cost']:.2f}")
-    report.append(f"    Cost per image: ${gemini3_4k_cost['cost_per_image']:.4f}")
-    report.append(f"    Tokens per image: {gemini3_4k_cost.get('tokens_per_image', 'N/A')}")
-    report.append(f"    ⚠️  {gemini3_4k_cost['cost_per_image'] / imagen_cost['cost_per_image']:.1f}x more expensive than Imagen")
-    report.append("")
+    imagen_cost = data["details"]["imagen4"]
+    gemini3_1k_cost = data["details"]["gemini3_pro_1k"]
+    gemini3_4k_cost = data["details"]["gemini3_pro_4k"]
+    
+    out.write(f"  Imagen 4 ({num_images:,} images):\n")
+    out.write(f"    Cost: ${imagen_cost['total_cost']:.2f}\n")
+    out.write(f"    Cost per image: ${imagen_cost['cost_per_image']:.4f}\n")
+    out.write("\n")
+    
+    out.write(f"  Gemini 3 Pro 1K/2K ({num_images:,} images):\n")
+    out.write(f"    Cost: ${gemini3_1k_cost['total_cost']:.2f}\n")
+    out.write(f"    Cost per image: ${gemini3_1k_cost['cost_per_image']:.4f}\n")
+    out.write(f"    Tokens per image: {gemini3_1k_cost.get('tokens_per_image', 'N/A')}\n")
+    out.write(f"    ⚠️  {gemini3_1k_cost['cost_per_image'] / imagen_cost['cost_per_image']:.1f}x more expensive than Imagen\n")
+    out.write("\n")
+    
+    out.write(f"  Gemini 3 Pro 4K ({num_images:,} images):\n")
+    out.write(f"    Cost: ${gemini3_4k_cost['total_cost']:.2f}\n")
+    out.write(f"    Cost per image: ${gemini3_4k_cost['cost_per_image']:.4f}\n")
+    out.write(f"    Tokens per image: {gemini3_4k_cost.get('tokens_per_image', 'N/A')}\n")
+    out.write(f"    ⚠️  {gemini3_4k_cost['cost_per_image'] / imagen_cost['cost_per_image']:.1f}x more expensive than Imagen\n")
+    out.write("\n")
     
     # Cost Difference
-    cost_diff_1k = gemini3_1k_cost['total_cost'] - imagen_cost['total_cost']
-    cost_diff_4k = gemini3_4k_cost['total_cost'] - imagen_cost['total_cost']
-    
-    report.append("📈 COST DIFFERENCE")
-    report.append("-" * 80)
-    report.append(f"  Gemini 3 Pro 1K/2K vs Imagen 4:")
-    report.append(f"    Extra cost: ${cost_diff_1k:.2f} ({cost_diff_1k / TOTAL_AVAILABLE * 100:.2f}% of credits)")
-    report.append(f"    You could generate {int(cost_diff_1k / imagen_cost['cost_per_image']):,} more images with Imagen")
-    report.append("")
-    report.append(f"  Gemini 3 Pro 4K vs Imagen 4:")
-    report.append(f"    Extra cost: ${cost_diff_4k:.2f} ({cost_diff_4k / TOTAL_AVAILABLE * 100:.2f}% of credits)")
-    report.append(f"    You could generate {int(cost_diff_4k / imagen_cost['cost_per_image']):,} more images with Imagen")
-    report.append("")
+    cost_diff_1k = data["cost_diffs"]["gemini3_pro_1k"]
+    cost_diff_4k = data["cost_diffs"]["gemini3_pro_4k"]
+    # Image counts below round() before int(): e.g. 59.8 / 0.04 evaluates
+    # to 1494.999... and would truncate one short
+    
+    out.write("📈 COST DIFFERENCE\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write(f"  Gemini 3 Pro 1K/2K vs Imagen 4:\n")
+    out.write(f"    Extra cost: ${cost_diff_1k:.2f} ({cost_diff_1k / total_available * 100:.2f}% of credits)\n")
+    out.write(f"    You could generate {int(round(cost_diff_1k / imagen_cost['cost_per_image'], 9)):,} more images with Imagen\n")
+    out.write("\n")
+    out.write(f"  Gemini 3 Pro 4K vs Imagen 4:\n")
+    out.write(f"    Extra cost: ${cost_diff_4k:.2f} ({cost_diff_4k / total_available * 100:.2f}% of credits)\n")
+    out.write(f"    You could generate {int(round(cost_diff_4k / imagen_cost['cost_per_image'], 9)):,} more images with Imagen\n")
+    out.write("\n")
     
     # Maximum Images Possible
-    report.append("🚀 MAXIMUM IMAGES POSSIBLE WITH YOUR CREDITS")
-    report.append("-" * 80)
+    out.write("🚀 MAXIMUM IMAGES POSSIBLE WITH YOUR CREDITS\n")
+    out.write(f"{DASH_LINE}\n")
     
-    for model in ["imagen4_fast", "imagen4", "gemini3_pro_1k", "gemini3_pro_4k"]:
-        costs = calculate_image_costs(1, model)
-        max_images = int(TOTAL_AVAILABLE / costs["cost_per_image"])
-        report.append(f"  {costs['description']}:")
-        report.append(f"    Maximum images: {max_images:,}")
-        report.append(f"    Cost per image: ${costs['cost_per_image']:.4f}")
-        report.append("")
+    for model, max_images in data["max_images"].items():
+        out.write(_MAX_IMAGES_TMPL.format(
+            description=IMAGE_PRICING[model]["description"],
+            max_images=max_images,
+            unit_price=data["unit_prices"][model],
+        ))
     
     # Recommendations
-    report.append("💡 RECOMMENDATIONS")
-    report.append("-" * 80)
-    report.append("")
-    report.append("  ✅ BEST VALUE: Imagen 4 Fast ($0.02/image)")
-    report.append("     • Cheapest option")
-    report.append("     • Good for stress testing")
-    report.append("")
-    report.append("  ✅ STANDARD: Imagen 3/4 ($0.04/image)")
-    report.append("     • Best balance of quality and cost")
-    report.append("     • What Yuki currently uses")
-    report.append("")
-    report.append("  ⚠️  AVOID FOR STRESS TESTS: Gemini 3 Pro Image Output")
-    report.append("     • 1K/2K: $0.134/image (3.35x more expensive)")
-    report.append("     • 4K: $0.24/image (6x more expensive)")
-    report.append("     • Use only when you need Gemini's multimodal capabilities")
-    report.append("     • Not cost-effective for pure image generation")
-    report.append("")
+    out.write("💡 RECOMMENDATIONS\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
+    out.write("  ✅ BEST VALUE: Imagen 4 Fast ($0.02/image)\n")
+    out.write("     • Cheapest option\n")
+    out.write("     • Good for stress testing\n")
+    out.write("\n")
+    out.write("  ✅ STANDARD: Imagen 3/4 ($0.04/image)\n")
+    out.write("     • Best balance of quality and cost\n")
+    out.write("     • What Yuki currently uses\n")
+    out.write("\n")
+    out.write("  ⚠️  AVOID FOR STRESS TESTS: Gemini 3 Pro Image Output\n")
+    out.write("     • 1K/2K: $0.134/image (3.35x more expensive)\n")
+    out.write("     • 4K: $0.24/image (6x more expensive)\n")
+    out.write("     • Use only when you need Gemini's multimodal capabilities\n")
+    out.write("     • Not cost-effective for pure image generation\n")
+    out.write("\n")
     
     # Your 300 Images Analysis
-    report.append("📊 YOUR 300 IMAGES ANALYSIS")
-    report.append("-" * 80)
-    
-    for model in ["imagen4", "gemini3_pro_1k", "gemini3_pro_4k"]:
-        costs = calculate_image_costs(300, model)
-        report.append(f"  {costs['description']}:")
-        report.append(f"    Total cost: ${costs['total_cost']:.2f}")
-        report.append(f"    Credits remaining: ${costs['credits_remaining_after']:.2f}")
-        report.append(f"    % of credits used: {costs['percent_of_credits_used']:.2f}%")
-        report.append("")
+    out.write("📊 YOUR 300 IMAGES ANALYSIS\n")
+    out.write(f"{DASH_LINE}\n")
     
-    report.append("=" * 80)
+    for costs in data["usage_300"].values():
+        out.write(_USAGE_300_TMPL.format_map(costs))
     
-    return "\n".join(report)
+    out.write(EQ_LINE)
+
+
+def write_comparison_report(out: TextIO, num_images: int = 300) -> None:
+    """Write the model comparison report to a text stream."""
+    render_comparison_report(out, compute_comparison(num_images))
+
+
+def generate_comparison_report(num_images: int = 300):
+    """Generate comparison report for different image generation models."""
+    out = io.StringIO()
+    write_comparison_report(out, num_images)
+    return out.getvalue()
 
 
 def main():
@@ -252,14 +362,13 @@ def main():
     
     args = parser.parse_args()
     
-    report = generate_comparison_report(args.images)
-    print(report)
-    
-    # Save report
-    report_file = Path("data/gemini3_pro_image_comparison.txt")
-    report_file.parent.mkdir(parents=True, exist_ok=True)
+    # Stream the report to the terminal and the file in one pass
+    report_file = _REPORT_FILE
+    if not _REPORT_DIR.is_dir():
+        _REPORT_DIR.mkdir(parents=True, exist_ok=True)
     with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+        write_comparison_report(_Tee(sys.stdout, f), args.images)
+    print()
     
     print(f"\n💾 Report saved to: {report_file}")
 
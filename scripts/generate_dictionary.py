@@ -7,12 +7,21 @@ Uses the Unk Agent (Unk Mode) to expand the slang dictionary.
 import asyncio
 import json
 import os
+from pathlib import Path
 from typing import List, Dict
 from gemini_agent import UnkAgent
 from google import genai
 from google.genai import types
 from pydantic import BaseModel, Field
 
+# Optional: orjson for faster dictionary load/save
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 # Define structured output for the generator
 class SlangEntry(BaseModel):
     term: str = Field(..., description="The modern slang term (Yn language)")
@@ -25,54 +34,115 @@ class SlangEntry(BaseModel):
 class SlangBatch(BaseModel):
     entries: List[SlangEntry]
 
-async def generate_dictionary(
-    base_terms: List[str], 
-    project_id: str = "unk-app-480102"
-):
-    agent = UnkAgent(
-        mode="unk_mode",  # Use Unk Mode for the wisdom
-        gcp_project=project_id,
-        enable_structured_output=True
-    )
-    
-    prompt = f"""
+def _read_seed(seed_file: str) -> List[Dict]:
+    """Load the dictionary seed file."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(Path(seed_file).read_bytes())
+    with open(seed_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_seed(seed_file: str, data: List[Dict]) -> None:
+    """Save the dictionary seed file (2-space indent, UTF-8) with either backend."""
+    if ORJSON_AVAILABLE:
+        Path(seed_file).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(seed_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+# Terms per request; small chunks let the backend generate them in parallel
+CHUNK_SIZE = 3
+
+ENTRY_PROMPT = """
     We are building a "Yn to Unk" dictionary for professionals aged 35+.
     
-    I need you to generate detailed dictionary entries for the following terms, 
-    plus add 5 more relevant modern slang terms that you think are crucial for this audience.
+    I need you to generate detailed dictionary entries for the following terms.
     
     Focus on "Unk Translations" that use older idioms (e.g., "brown-nosing", "putting your nose to the grindstone").
     
-    Base Terms: {', '.join(base_terms)}
+    Base Terms: {terms}
     
     Output a JSON list of objects.
     """
+
+DISCOVER_PROMPT = """
+    We are building a "Yn to Unk" dictionary for professionals aged 35+.
+    
+    Add 5 relevant modern slang terms that you think are crucial for this audience.
+    Do not repeat any of these terms: {terms}
     
-    print(f"Generating dictionary entries using {agent.model_id}...")
+    Focus on "Unk Translations" that use older idioms (e.g., "brown-nosing", "putting your nose to the grindstone").
     
-    # We use the client directly to force the specific schema response if the agent wrapper is tricky
-    # But the agent wrapper supports structured output via the wrapper.
-    # Let's try the wrapper's classify/execute flow or just direct generation config.
+    Output a JSON list of objects.
+    """
+
+def _entry_config(agent: UnkAgent) -> types.GenerateContentConfig:
+    """Structured-output config shared by every request in a run."""
+    return types.GenerateContentConfig(
+        system_instruction=agent.system_instruction,
+        response_mime_type="application/json",
+        response_schema=SlangBatch
+    )
+
+async def _generate_entries(
+    agent: UnkAgent, 
+    prompt: str, 
+    config: types.GenerateContentConfig
+) -> List[SlangEntry]:
+    """Run one structured-output request and return its parsed entries."""
+    # One-shot generate_content rather than the agent's chat session:
+    # no history is kept, and concurrent sends on a shared chat are not safe.
+    response = await agent.client.aio.models.generate_content(
+        model=agent.model_id,
+        contents=prompt,
+        config=config
+    )
     
-    try:
-        await agent.start_session()
-        response = await agent.chat_session.send_message(
-            prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=SlangBatch
-            )
+    if response.parsed:
+        return response.parsed.entries
+    print("Failed to parse structured output.")
+    return []
+
+# One agent (and its genai.Client connection) per project, reused across runs
+_agents: Dict[str, UnkAgent] = {}
+
+def _get_agent(project_id: str) -> UnkAgent:
+    """Return the cached Unk Mode agent for a project, creating it on first use."""
+    agent = _agents.get(project_id)
+    if agent is None:
+        agent = UnkAgent(
+            mode="unk_mode",  # Use Unk Mode for the wisdom
+            gcp_project=project_id,
+            enable_structured_output=True
         )
-        
-        if response.parsed:
-            return response.parsed.entries
-        else:
-            print("Failed to parse structured output.")
-            return []
-            
-    except Exception as e:
-        print(f"Error generating dictionary: {e}")
-        return []
+        _agents[project_id] = agent
+    return agent
+
+async def generate_dictionary(
+    base_terms: List[str], 
+    project_id: str = "unk-app-480102"
+):
+    agent = _get_agent(project_id)
+    
+    chunks = [base_terms[i:i + CHUNK_SIZE] for i in range(0, len(base_terms), CHUNK_SIZE)]
+    prompts = [ENTRY_PROMPT.format(terms=", ".join(chunk)) for chunk in chunks]
+    # Discovery of new terms runs alongside the base-term batches
+    prompts.append(DISCOVER_PROMPT.format(terms=", ".join(base_terms)))
+    
+    print(f"Generating dictionary entries using {agent.model_id} ({len(prompts)} parallel requests)...")
+    
+    config = _entry_config(agent)
+    results = await asyncio.gather(
+        *(_generate_entries(agent, prompt, config) for prompt in prompts),
+        return_exceptions=True
+    )
+    
+    entries = []
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Error generating dictionary: {result}")
+            continue
+        entries.extend(result)
+    return entries
 
 async def main():
     # Load seed data to get started or just define a list
@@ -80,9 +150,8 @@ async def main():
     existing_data = []
     
     if os.path.exists(seed_file):
-        with open(seed_file, "r") as f:
-            existing_data = json.load(f)
-            print(f"Loaded {len(existing_data)} existing entries.")
+        existing_data = await asyncio.to_thread(_read_seed, seed_file)
+        print(f"Loaded {len(existing_data)} existing entries.")
     
     # List of terms to expand or re-generate (just a few for testing)
     terms_to_process = ["aura", "skibidi", "sigma", "mewing", "fanum tax", "crash out"]
@@ -90,20 +159,20 @@ async def main():
     new_entries = await generate_dictionary(terms_to_process)
     
     if new_entries:
-        # Convert Pydantic models to dicts
-        new_data_dicts = [entry.model_dump() for entry in new_entries]
-        
-        # Merge (simple de-duplication by term)
+        # Merge (simple de-duplication by term, including within the new batch);
+        # only entries that survive are converted to dicts
         existing_terms = {item['term'].lower() for item in existing_data}
         
-        for entry in new_data_dicts:
-            if entry['term'].lower() not in existing_terms:
-                existing_data.append(entry)
-                print(f"Added new term: {entry['term']}")
+        for entry in new_entries:
+            key = entry.term.lower()
+            if key in existing_terms:
+                continue
+            existing_terms.add(key)
+            existing_data.append(entry.model_dump())
+            print(f"Added new term: {entry.term}")
         
-        # Save back to file
-        with open(seed_file, "w") as f:
-            json.dump(existing_data, f, indent=4)
+        # Save back to file (off the event loop)
+        await asyncio.to_thread(_write_seed, seed_file, existing_data)
         
         print(f"Dictionary updated. Total entries: {len(existing_data)}")
     else:
@@ -8,9 +8,13 @@ Usage:
     python scripts/image_generation_cost_calculator.py [--images N] [--model imagen3|imagen4]
 """
 
+import io
 import sys
 import argparse
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, NamedTuple, Tuple
 
 # Credit information
 CREDITS = {
@@ -26,6 +30,9 @@ CREDITS = {
 
 TOTAL_AVAILABLE = sum(c["remaining"] for c in CREDITS.values() if c["status"] == "Available")
 
+EQ_LINE = "=" * 80
+DASH_LINE = "-" * 80
+
 # Image generation pricing from CSV
 IMAGE_PRICING = {
     "imagen3": {
@@ -42,182 +49,204 @@ IMAGE_PRICING = {
     }
 }
 
+# Read-only view: the calculator is memoized, so pricing must not change
+IMAGE_PRICING = MappingProxyType({
+    key: MappingProxyType(entry) for key, entry in IMAGE_PRICING.items()
+})
+
+
+def _unit_cost(pricing) -> float:
+    """Cost of one image, whether priced per image or per 1M images."""
+    if "price_per_image" in pricing:
+        return pricing["price_per_image"]
+    return pricing["price_per_1m_images"] / 1_000_000
+
+
+# Derived per-model figures, computed once from the constants above
+_PRECOMPUTED = {}
+for _model, _pricing in IMAGE_PRICING.items():
+    _cost = _unit_cost(_pricing)
+    _PRECOMPUTED[_model] = {
+        "cost_per_image": _cost,
+        "images_per_dollar": 1.0 / _cost if _cost > 0 else 0,
+        "max_images_on_credits": int(TOTAL_AVAILABLE / _cost) if _cost > 0 else 0,
+    }
+
+
+class ImageCosts(NamedTuple):
+    """Cost breakdown for one (num_images, model) pair."""
+    model: str
+    num_images: int
+    cost_per_image: float
+    total_cost: float
+    images_per_dollar: float
+    credits_remaining_after: float
+    percent_of_credits_used: float
 
-def calculate_image_generation_costs(num_images: int, model: str = "imagen3") -> dict:
-    """Calculate costs for image generation."""
+
+@lru_cache(maxsize=128)
+def calculate_image_generation_costs(num_images: int, model: str = "imagen3") -> ImageCosts:
+    """
+    Calculate costs for image generation.
+    
+    Results are memoized per (num_images, model); use ``._asdict()`` when a
+    dict is needed.
+    """
     
     if model not in IMAGE_PRICING:
         model = "imagen3"
     
-    pricing = IMAGE_PRICING[model]
+    precomputed = _PRECOMPUTED[model]
+    cost_per_image = precomputed["cost_per_image"]
+    total_cost = num_images * cost_per_image
     
-    if "price_per_image" in pricing:
-        cost_per_image = pricing["price_per_image"]
-        total_cost = num_images * cost_per_image
-    else:
-        # For per-1M pricing
-        cost_per_image = pricing["price_per_1m_images"] / 1_000_000
-        total_cost = num_images * cost_per_image
-    
-    return {
-        "model": model,
-        "num_images": num_images,
-        "cost_per_image": cost_per_image,
-        "total_cost": round(total_cost, 2),
-        "images_per_dollar": round(1.0 / cost_per_image, 2) if cost_per_image > 0 else 0,
-        "credits_remaining_after": round(TOTAL_AVAILABLE - total_cost, 2),
-        "percent_of_credits_used": round((total_cost / TOTAL_AVAILABLE) * 100, 2) if TOTAL_AVAILABLE > 0 else 0
-    }
+    return ImageCosts(
+        model=model,
+        num_images=num_images,
+        cost_per_image=cost_per_image,
+        total_cost=round(total_cost, 2),
+        images_per_dollar=round(precomputed["images_per_dollar"], 2),
+        credits_remaining_after=round(TOTAL_AVAILABLE - total_cost, 2),
+        percent_of_credits_used=round((total_cost / TOTAL_AVAILABLE) * 100, 2) if TOTAL_AVAILABLE > 0 else 0
+    )
 
 
-def calculate_stress_test_scenarios():
-    """Calculate various stress test scenarios."""
-    
-    scenarios = [
-        {"name": "Small Test", "images": 100},
-        {"name": "Medium Test", "images": 500},
-        {"name": "Large Test", "images": 1000},
-        {"name": "Stress Test", "images": 5000},
-        {"name": "Extreme Stress Test", "images": 10000},
-        {"name": "Maximum Burn Test", "images": 30000},
-    ]
-    
-    results = []
-    for scenario in scenarios:
-        for model in ["imagen3", "imagen4"]:
-            costs = calculate_image_generation_costs(scenario["images"], model)
-            results.append({
-                **scenario,
-                **costs
-            })
+# Stress test grid: every scenario size is costed against every model
+STRESS_SCENARIOS = (
+    ("Small Test", 100),
+    ("Medium Test", 500),
+    ("Large Test", 1000),
+    ("Stress Test", 5000),
+    ("Extreme Stress Test", 10000),
+    ("Maximum Burn Test", 30000),
+)
+STRESS_MODELS = ("imagen3", "imagen4")
+
+
+def calculate_stress_test_scenarios() -> Dict[Tuple[str, str], ImageCosts]:
+    """Calculate various stress test scenarios, keyed by (scenario name, model)."""
     
-    return results
+    return {
+        (name, model): calculate_image_generation_costs(images, model)
+        for name, images in STRESS_SCENARIOS
+        for model in STRESS_MODELS
+    }
 
 
+@lru_cache(maxsize=32)
 def generate_report(num_images: int = None, model: str = "imagen3"):
-    """Generate cost analysis report."""
+    """Generate cost analysis report (memoized; depends only on its arguments)."""
     
-    report = []
-    report.append("=" * 80)
-    report.append("🎨 IMAGE GENERATION COST ANALYSIS (Yuki Stress Tests)")
-    report.append("=" * 80)
-    report.append("")
+    out = io.StringIO()
+    out.write(f"{EQ_LINE}\n")
+    out.write("🎨 IMAGE GENERATION COST ANALYSIS (Yuki Stress Tests)\n")
+    out.write(f"{EQ_LINE}\n")
+    out.write("\n")
     
     # Current Credits
-    report.append("💰 CURRENT CREDIT STATUS")
-    report.append("-" * 80)
-    report.append(f"  Total Available: ${TOTAL_AVAILABLE:.2f}")
-    report.append("")
+    out.write("💰 CURRENT CREDIT STATUS\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write(f"  Total Available: ${TOTAL_AVAILABLE:.2f}\n")
+    out.write("\n")
     
     # Pricing Information
-    report.append("📊 IMAGE GENERATION PRICING")
-    report.append("-" * 80)
+    out.write("📊 IMAGE GENERATION PRICING\n")
+    out.write(f"{DASH_LINE}\n")
     for model_key, pricing in IMAGE_PRICING.items():
+        precomputed = _PRECOMPUTED[model_key]
         if "price_per_image" in pricing:
-            report.append(f"  {pricing['description']}: ${pricing['price_per_image']:.4f} per image")
-            report.append(f"    → {int(1.0 / pricing['price_per_image']):,} images per $1")
+            out.write(f"  {pricing['description']}: ${pricing['price_per_image']:.4f} per image\n")
+            out.write(f"    → {int(precomputed['images_per_dollar']):,} images per $1\n")
         else:
-            cost_per_image = pricing["price_per_1m_images"] / 1_000_000
-            report.append(f"  {pricing['description']}: ${cost_per_image:.6f} per image")
-            report.append(f"    → {int(1.0 / cost_per_image):,} images per $1")
-            report.append(f"    ⚠️  VERY EXPENSIVE - Avoid for stress tests!")
-        report.append("")
+            out.write(f"  {pricing['description']}: ${precomputed['cost_per_image']:.6f} per image\n")
+            out.write(f"    → {int(precomputed['images_per_dollar']):,} images per $1\n")
+            out.write(f"    ⚠️  VERY EXPENSIVE - Avoid for stress tests!\n")
+        out.write("\n")
     
     # Specific Calculation
     if num_images:
         costs = calculate_image_generation_costs(num_images, model)
-        report.append(f"📈 COST ANALYSIS FOR {num_images:,} IMAGES ({costs['model'].upper()})")
-        report.append("-" * 80)
-        report.append(f"  Images to generate: {costs['num_images']:,}")
-        report.append(f"  Cost per image: ${costs['cost_per_image']:.6f}")
-        report.append(f"  Total cost: ${costs['total_cost']:.2f}")
-        report.append(f"  Images per $1: {costs['images_per_dollar']:,}")
-        report.append(f"  Credits remaining: ${costs['credits_remaining_after']:.2f}")
-        report.append(f"  % of credits used: {costs['percent_of_credits_used']:.2f}%")
-        report.append("")
+        out.write(f"📈 COST ANALYSIS FOR {num_images:,} IMAGES ({costs.model.upper()})\n")
+        out.write(f"{DASH_LINE}\n")
+        out.write(f"  Images to generate: {costs.num_images:,}\n")
+        out.write(f"  Cost per image: ${costs.cost_per_image:.6f}\n")
+        out.write(f"  Total cost: ${costs.total_cost:.2f}\n")
+        out.write(f"  Images per $1: {costs.images_per_dollar:,}\n")
+        out.write(f"  Credits remaining: ${costs.credits_remaining_after:.2f}\n")
+        out.write(f"  % of credits used: {costs.percent_of_credits_used:.2f}%\n")
+        out.write("\n")
     
     # Stress Test Scenarios
-    report.append("🎯 STRESS TEST SCENARIOS")
-    report.append("-" * 80)
-    report.append("")
+    out.write("🎯 STRESS TEST SCENARIOS\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
     
     scenarios = calculate_stress_test_scenarios()
     
-    # Group by scenario name
-    scenario_groups = {}
-    for result in scenarios:
-        name = result["name"]
-        if name not in scenario_groups:
-            scenario_groups[name] = []
-        scenario_groups[name].append(result)
-    
-    for scenario_name in ["Small Test", "Medium Test", "Large Test", "Stress Test", "Extreme Stress Test", "Maximum Burn Test"]:
-        if scenario_name not in scenario_groups:
-            continue
-        
-        results = scenario_groups[scenario_name]
-        report.append(f"  📌 {scenario_name}:")
+    for scenario_name, _ in STRESS_SCENARIOS:
+        out.write(f"  📌 {scenario_name}:\n")
         
-        for result in results:
-            model_display = result["model"].replace("imagen", "Imagen ").upper()
-            report.append(f"     {model_display}:")
-            report.append(f"       {result['num_images']:,} images = ${result['total_cost']:.2f}")
-            report.append(f"       Remaining credits: ${result['credits_remaining_after']:.2f}")
-            report.append(f"       Credit usage: {result['percent_of_credits_used']:.2f}%")
+        for stress_model in STRESS_MODELS:
+            result = scenarios[(scenario_name, stress_model)]
+            model_display = result.model.replace("imagen", "Imagen ").upper()
+            out.write(f"     {model_display}:\n")
+            out.write(f"       {result.num_images:,} images = ${result.total_cost:.2f}\n")
+            out.write(f"       Remaining credits: ${result.credits_remaining_after:.2f}\n")
+            out.write(f"       Credit usage: {result.percent_of_credits_used:.2f}%\n")
         
-        report.append("")
+        out.write("\n")
     
     # Maximum Images Possible
-    report.append("🚀 MAXIMUM IMAGES POSSIBLE")
-    report.append("-" * 80)
+    out.write("🚀 MAXIMUM IMAGES POSSIBLE\n")
+    out.write(f"{DASH_LINE}\n")
     
     for model_key, pricing in IMAGE_PRICING.items():
         if "price_per_image" in pricing:
-            max_images = int(TOTAL_AVAILABLE / pricing["price_per_image"])
-            report.append(f"  {pricing['description']}:")
-            report.append(f"    Maximum images: {max_images:,}")
-            report.append(f"    Cost: ${TOTAL_AVAILABLE:.2f}")
-            report.append("")
+            max_images = _PRECOMPUTED[model_key]["max_images_on_credits"]
+            out.write(f"  {pricing['description']}:\n")
+            out.write(f"    Maximum images: {max_images:,}\n")
+            out.write(f"    Cost: ${TOTAL_AVAILABLE:.2f}\n")
+            out.write("\n")
     
     # Recommendations
-    report.append("💡 RECOMMENDATIONS FOR STRESS TESTING")
-    report.append("-" * 80)
-    report.append("")
-    report.append("  1. ✅ Use Imagen 3 or 4 for stress tests ($0.04/image)")
-    report.append("  2. ✅ Start with small batches (100-500 images)")
-    report.append("  3. ✅ Monitor credit burn rate after each test")
-    report.append("  4. ⚠️  Avoid Gemini 3.0 Pro for image generation ($120/1M images)")
-    report.append("  5. 💰 At $0.04/image, you can generate:")
-    report.append(f"     • {int(TOTAL_AVAILABLE / 0.04):,} images total")
-    report.append(f"     • {int((TOTAL_AVAILABLE / 0.04) / 30):,} images/day for 30 days")
-    report.append(f"     • {int((TOTAL_AVAILABLE / 0.04) / 7):,} images/day for 7 days")
-    report.append("")
+    out.write("💡 RECOMMENDATIONS FOR STRESS TESTING\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write("\n")
+    out.write("  1. ✅ Use Imagen 3 or 4 for stress tests ($0.04/image)\n")
+    out.write("  2. ✅ Start with small batches (100-500 images)\n")
+    out.write("  3. ✅ Monitor credit burn rate after each test\n")
+    out.write("  4. ⚠️  Avoid Gemini 3.0 Pro for image generation ($120/1M images)\n")
+    out.write("  5. 💰 At $0.04/image, you can generate:\n")
+    out.write(f"     • {int(TOTAL_AVAILABLE / 0.04):,} images total\n")
+    out.write(f"     • {int((TOTAL_AVAILABLE / 0.04) / 30):,} images/day for 30 days\n")
+    out.write(f"     • {int((TOTAL_AVAILABLE / 0.04) / 7):,} images/day for 7 days\n")
+    out.write("\n")
     
     # Daily Burn Rate Analysis
     if num_images:
         costs = calculate_image_generation_costs(num_images, model)
-        daily_burn = costs["total_cost"]
+        daily_burn = costs.total_cost
         days_remaining = TOTAL_AVAILABLE / daily_burn if daily_burn > 0 else float('inf')
         
-        report.append("📅 DAILY BURN RATE ANALYSIS")
-        report.append("-" * 80)
-        report.append(f"  If generating {num_images:,} images/day:")
-        report.append(f"  Daily cost: ${daily_burn:.2f}")
-        report.append(f"  Weekly cost: ${daily_burn * 7:.2f}")
-        report.append(f"  Monthly cost: ${daily_burn * 30:.2f}")
+        out.write("📅 DAILY BURN RATE ANALYSIS\n")
+        out.write(f"{DASH_LINE}\n")
+        out.write(f"  If generating {num_images:,} images/day:\n")
+        out.write(f"  Daily cost: ${daily_burn:.2f}\n")
+        out.write(f"  Weekly cost: ${daily_burn * 7:.2f}\n")
+        out.write(f"  Monthly cost: ${daily_burn * 30:.2f}\n")
         
         if days_remaining != float('inf'):
             if days_remaining > 365:
-                report.append(f"  ⏰ Credits will last: {days_remaining / 365:.1f} years ({days_remaining:.0f} days)")
+                out.write(f"  ⏰ Credits will last: {days_remaining / 365:.1f} years ({days_remaining:.0f} days)\n")
             elif days_remaining > 30:
-                report.append(f"  ⏰ Credits will last: {days_remaining / 30:.1f} months ({days_remaining:.0f} days)")
+                out.write(f"  ⏰ Credits will last: {days_remaining / 30:.1f} months ({days_remaining:.0f} days)\n")
             else:
-                report.append(f"  ⏰ Credits will last: {days_remaining:.1f} days")
-        report.append("")
+                out.write(f"  ⏰ Credits will last: {days_remaining:.1f} days\n")
+        out.write("\n")
     
-    report.append("=" * 80)
+    out.write(EQ_LINE)
     
-    return "\n".join(report)
+    return out.getvalue()
 
 
 def main():
@@ -48,12 +48,23 @@ def main():
         # Count what would be imported
         import csv
         count = 0
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            # Resolve column positions from the header once
+            index = {name: i for i, name in enumerate(next(reader, []))}
+            columns = [index.get(name) for name in ('Google service', 'SKU ID', 'Contract price ($)')]
+            if None in columns:
+                reader = ()  # a required column is missing, so no row qualifies
+            else:
+                service_col, sku_col, price_col = columns
+                min_width = max(columns) + 1
+            
             for row in reader:
-                service = row.get('Google service', '').strip()
-                sku_id = row.get('SKU ID', '').strip()
-                contract_price = row.get('Contract price ($)', '').strip()
+                if len(row) < min_width:
+                    continue
+                service = row[service_col].strip()
+                sku_id = row[sku_col].strip()
+                contract_price = row[price_col].strip()
                 if service and sku_id and contract_price:
                     try:
                         float(contract_price)
@@ -9,73 +9,168 @@ from bs4 import BeautifulSoup
 import json
 import os
 
+# Optional: orjson for faster record encoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Optional: lxml (C parser + compiled XPath) is much faster than html.parser
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    etree = None
+
 URL = "https://unicode.org/emoji/charts/full-emoji-list.html"
 OUTPUT_FILE = "unk_emoji_db.json"
 
+# (tag, class) cells looked up in each table row
+_CELLS = (("th", "bighead"), ("th", "mediumhead"), ("td", "chars"), ("td", "name"))
+
+if LXML_AVAILABLE:
+    # First descendant whose class list contains the class, like bs4's class_=
+    _LXML_FINDERS = {
+        (tag, cls): etree.XPath(
+            f"descendant::{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')][1]"
+        )
+        for tag, cls in _CELLS
+    }
+
+def _lxml_find(row, tag, cls):
+    matches = _LXML_FINDERS[(tag, cls)](row)
+    return matches[0] if matches else None
+
+def _lxml_text(element) -> str:
+    """Same result as bs4's get_text(strip=True)."""
+    return "".join(text.strip() for text in element.itertext())
+
+def _drain_rows(parser):
+    for _, row in parser.read_events():
+        yield row
+        # Free the handled row and its earlier siblings so the tree stays small
+        row.clear()
+        parent = row.getparent()
+        if parent is not None:
+            while row.getprevious() is not None:
+                del parent[0]
+
+def _stream_rows(response):
+    """Yield each <tr> as soon as lxml has parsed it, while the body downloads."""
+    content_type = response.headers.get("content-type", "").lower()
+    encoding = response.encoding if "charset" in content_type else None
+    parser = etree.HTMLPullParser(events=("end",), tag="tr", encoding=encoding)
+    with response:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            parser.feed(chunk)
+            yield from _drain_rows(parser)
+    parser.close()
+    yield from _drain_rows(parser)
+
+def _write_db(emojis, path):
+    """
+    Write the emoji list as a JSON array with one compact record per line.
+    
+    Still a plain JSON array for search_emoji_db, but without indent=2
+    padding and streamed record by record instead of encoded in one go.
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(b"[\n")
+            for i, emoji in enumerate(emojis):
+                if i:
+                    f.write(b",\n")
+                f.write(orjson.dumps(emoji))
+            f.write(b"\n]\n")
+        return
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[\n")
+        for i, emoji in enumerate(emojis):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(emoji, ensure_ascii=False, separators=(",", ":")))
+        f.write("\n]\n")
+
 def scrape_emojis():
     print(f"Fetching {URL}...")
     try:
-        response = requests.get(URL, timeout=30)
+        # With lxml the body is streamed and parsed as it arrives
+        response = requests.get(URL, timeout=30, stream=LXML_AVAILABLE)
         response.raise_for_status()
     except Exception as e:
         print(f"Failed to fetch URL: {e}")
         return
 
-    print("Parsing HTML (this may take a moment)...")
-    soup = BeautifulSoup(response.text, 'html.parser')
+    if LXML_AVAILABLE:
+        print("Parsing HTML as it downloads...")
+        rows = _stream_rows(response)
+        find, get_text = _lxml_find, _lxml_text
+    else:
+        print("Parsing HTML (this may take a moment)...")
+        soup = BeautifulSoup(response.text, 'html.parser')
+        rows = soup.find_all('tr')
+        find = lambda row, tag, cls: row.find(tag, class_=cls)
+        get_text = lambda element: element.get_text(strip=True)
+        print(f"Processing {len(rows)} rows...")
     
     # The chart is usually a big <table>
     # Rows <tr> contain <th> (headers) or <td> (data)
     # We look for <tr> where we can extract the 'chars' and 'name' class columns
     
     emojis = []
-    rows = soup.find_all('tr')
     
     current_group = "Unknown"
     current_subgroup = "Unknown"
     
-    print(f"Processing {len(rows)} rows...")
-    
-    for row in rows:
-        # Check for group/subgroup headers
-        th_group = row.find('th', class_='bighead')
-        if th_group:
-            current_group = th_group.get_text(strip=True)
-            continue
+    # With lxml the rows are parsed while the body downloads, so a dropped
+    # connection or read timeout surfaces here rather than in requests.get
+    try:
+        for row in rows:
+            # Check for group/subgroup headers
+            th_group = find(row, 'th', 'bighead')
+            if th_group is not None:
+                current_group = get_text(th_group)
+                continue
+                
+            th_sub = find(row, 'th', 'mediumhead')
+            if th_sub is not None:
+                current_subgroup = get_text(th_sub)
+                continue
+                
+            # Data rows
+            # Unicode chart classes: 'chars' (the emoji), 'name' (description)
+            # Note: class names might vary, but 'chars' and 'name' are standard in older versions.
+            # Sometimes 'chars' is just the rendered glyph.
             
-        th_sub = row.find('th', class_='mediumhead')
-        if th_sub:
-            current_subgroup = th_sub.get_text(strip=True)
-            continue
+            td_char = find(row, 'td', 'chars')
+            td_name = find(row, 'td', 'name')
             
-        # Data rows
-        # Unicode chart classes: 'chars' (the emoji), 'name' (description)
-        # Note: class names might vary, but 'chars' and 'name' are standard in older versions.
-        # Sometimes 'chars' is just the rendered glyph.
-        
-        td_char = row.find('td', class_='chars')
-        td_name = row.find('td', class_='name')
-        
-        if td_char and td_name:
-            char = td_char.get_text(strip=True)
-            name = td_name.get_text(strip=True)
-            
-            # Filter out garbage or empty rows
-            if char and name:
-                emojis.append({
-                    "emoji": char,
-                    "name": name,
-                    "group": current_group,
-                    "subgroup": current_subgroup
-                })
+            if td_char is not None and td_name is not None:
+                char = get_text(td_char)
+                name = get_text(td_name)
+                
+                # Filter out garbage or empty rows
+                if char and name:
+                    emojis.append({
+                        "emoji": char,
+                        "name": name,
+                        "group": current_group,
+                        "subgroup": current_subgroup
+                    })
+    except requests.RequestException as e:
+        print(f"Failed to fetch URL: {e}")
+        return
     
     print(f"Found {len(emojis)} emojis.")
     
     # Post-processing: Add 'unk_tag' placeholder?
     # For now, just save the raw data.
     
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(emojis, f, indent=2, ensure_ascii=False)
+    _write_db(emojis, OUTPUT_FILE)
         
     print(f"Saved database to {OUTPUT_FILE}")
 
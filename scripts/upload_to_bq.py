@@ -4,30 +4,52 @@ Upload Unk Dictionary to BigQuery
 Uploads the generated JSON dictionary to a BigQuery table.
 """
 
+import io
 import os
 import json
+from functools import lru_cache
 from google.cloud import bigquery
 from google.api_core.exceptions import NotFound
 
+# Optional: orjson encodes straight to bytes and is much faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 # Configuration
 PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT", "unk-app-480102")
 DATASET_ID = "unk_knowledge_base"
 TABLE_ID = "slang_dictionary"
 JSON_FILE = "unk_dictionary_seed.json"
 
+# (project, dataset) pairs already ensured by this process; skips the RPC on repeat uploads
+_known_datasets = set()
+
+@lru_cache(maxsize=None)
+def _get_client(project_id: str) -> bigquery.Client:
+    """One client per project, so auth and the HTTP session are reused."""
+    return bigquery.Client(project=project_id)
+
 def upload_to_bigquery():
-    client = bigquery.Client(project=PROJECT_ID)
+    client = _get_client(PROJECT_ID)
     
-    # 1. Create Dataset if not exists
+    # 1. Create Dataset if not exists (checked once per process)
     dataset_ref = client.dataset(DATASET_ID)
-    try:
-        client.get_dataset(dataset_ref)
-        print(f"Dataset {DATASET_ID} already exists.")
-    except NotFound:
-        dataset = bigquery.Dataset(dataset_ref)
-        dataset.location = "US"
-        client.create_dataset(dataset)
-        print(f"Created dataset {DATASET_ID}.")
+    if (PROJECT_ID, DATASET_ID) not in _known_datasets:
+        # get_dataset first: loading only needs read access, while
+        # create_dataset needs bigquery.datasets.create even with exists_ok
+        try:
+            client.get_dataset(dataset_ref)
+            print(f"Dataset {DATASET_ID} already exists.")
+        except NotFound:
+            dataset = bigquery.Dataset(dataset_ref)
+            dataset.location = "US"
+            client.create_dataset(dataset, exists_ok=True)
+            print(f"Created dataset {DATASET_ID}.")
+        _known_datasets.add((PROJECT_ID, DATASET_ID))
 
     # 2. Define Schema
     schema = [
@@ -54,33 +76,35 @@ def upload_to_bigquery():
     )
     
     # 4. Prepare Data (NDJSON format required for BQ load from file)
-    # We read our standard JSON list and convert to NDJSON in memory or temp file
-    with open(JSON_FILE, "r") as f:
-        data = json.load(f)
+    # We read our standard JSON list and convert to NDJSON in memory
+    if ORJSON_AVAILABLE:
+        with open(JSON_FILE, "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(JSON_FILE, "r") as f:
+            data = json.load(f)
         
-    # Convert to NDJSON string
-    ndjson_data = "\n".join([json.dumps(record) for record in data])
+    # Encode compact NDJSON straight into an in-memory buffer
+    source_file = io.BytesIO()
+    if ORJSON_AVAILABLE:
+        for record in data:
+            source_file.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+    else:
+        for record in data:
+            source_file.write(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+            source_file.write(b"\n")
+    source_file.seek(0)
     
     # 5. Load Data
-    # We load from a file object (using io.StringIO would work, but let's write a temp file)
-    temp_ndjson = "temp_bq_load.json"
-    with open(temp_ndjson, "w") as f:
-        f.write(ndjson_data)
-        
-    with open(temp_ndjson, "rb") as source_file:
-        job = client.load_table_from_file(
-            source_file,
-            table_ref,
-            job_config=job_config
-        )
+    job = client.load_table_from_file(
+        source_file,
+        table_ref,
+        job_config=job_config
+    )
         
     job.result()  # Waits for the job to complete. 
     
     print(f"Loaded {job.output_rows} rows into {DATASET_ID}.{TABLE_ID}.")
-    
-    # Cleanup
-    if os.path.exists(temp_ndjson):
-        os.remove(temp_ndjson)
 
 if __name__ == "__main__":
     upload_to_bigquery()
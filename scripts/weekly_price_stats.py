@@ -8,12 +8,202 @@ Usage:
     python scripts/weekly_price_stats.py [csv_file]
 """
 
+import io
 import sys
 import csv
+import heapq
 from pathlib import Path
 from datetime import datetime, timedelta
 from collections import defaultdict
-from typing import Dict, List
+from operator import itemgetter
+from typing import Dict, Iterator, List, Tuple
+
+# Optional: pyarrow for a columnar (C++) CSV load
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pc = None
+    pa_csv = None
+
+# Optional: pyahocorasick to match every price-type keyword in one scan
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
+
+EQ_LINE = "=" * 80
+DASH_LINE = "-" * 80
+
+# Report blocks repeated per service / SKU
+_SERVICE_TMPL = (
+    "  {service}: {count} SKUs\n"
+    "    Price Range: ${min:.6f} - ${max:.6f}\n"
+    "    Average Price: ${avg:.6f}\n"
+    "\n"
+)
+_FREE_SERVICE_TMPL = "  {service}: {count} SKUs (free tier only)\n\n"
+_TOP_PRICE_TMPL = (
+    "  {rank}. {sku:.60}\n"
+    "     ${price:.6f} per {unit}\n"
+    "     Service: {service}\n"
+    "\n"
+)
+_FREE_TIER_TMPL = (
+    "  {sku:.60}\n"
+    "     Free up to: {free_up_to} {unit}\n"
+    "     Service: {service}\n"
+    "\n"
+)
+_CACHING_SAVINGS_TMPL = "    {model}: {savings_pct:.1f}% off (${savings_abs:.6f} per 1M tokens)\n"
+
+# Number of most expensive SKUs kept for the report
+TOP_PRICES = 5
+
+# Columns used by the analysis, in the order _iter_pricing_rows yields them
+PRICING_COLUMNS = (
+    "Google service",
+    "Service description",
+    "SKU ID",
+    "SKU description",
+    "Contract price ($)",
+    "Unit description",
+    "Tiered usage start",
+)
+
+
+# Substring in a Gemini SKU description -> model name, first match wins
+GEMINI_MODELS = (
+    ("2.5 Flash", "Gemini 2.5 Flash"),
+    ("2.5 Pro", "Gemini 2.5 Pro"),
+    ("3.0 Pro", "Gemini 3.0 Pro"),
+)
+
+# Price types in priority order; the first type with a keyword in the
+# (lowercased) SKU description wins
+PRICE_TYPE_KEYWORDS = (
+    ("input", ("input",)),
+    ("output", ("output",)),
+    ("storage", ("storage",)),
+    ("egress", ("egress", "transfer")),
+    ("operations", ("operations", "ops")),
+    ("generation", ("generation",)),
+    ("cpu", ("cpu",)),
+    ("memory", ("memory", "ram")),
+)
+_PRICE_TYPE_RANK = {label: rank for rank, (label, _) in enumerate(PRICE_TYPE_KEYWORDS)}
+
+if AHOCORASICK_AVAILABLE:
+    _PRICE_TYPE_AUTOMATON = ahocorasick.Automaton()
+    for _label, _keywords in PRICE_TYPE_KEYWORDS:
+        for _keyword in _keywords:
+            _PRICE_TYPE_AUTOMATON.add_word(_keyword, (_PRICE_TYPE_RANK[_label], _label))
+    _PRICE_TYPE_AUTOMATON.make_automaton()
+
+
+def classify_price_type(sku_desc_lower: str) -> str:
+    """Classify a lowercased SKU description into a price type."""
+    
+    if AHOCORASICK_AVAILABLE:
+        # One pass finds every keyword; keep the highest-priority label
+        best_rank, best_label = len(PRICE_TYPE_KEYWORDS), "unknown"
+        for _, (rank, label) in _PRICE_TYPE_AUTOMATON.iter(sku_desc_lower):
+            if rank < best_rank:
+                best_rank, best_label = rank, label
+                if rank == 0:
+                    break
+        return best_label
+    
+    # Plain substring tests: a single IGNORECASE alternation regex measured
+    # several times slower here, and first-match-by-position would also
+    # break the priority order above
+    for label, keywords in PRICE_TYPE_KEYWORDS:
+        for keyword in keywords:
+            if keyword in sku_desc_lower:
+                return label
+    return "unknown"
+
+
+def _iter_pricing_rows(csv_path: str) -> Iterator[Tuple[str, ...]]:
+    """
+    Yield the PRICING_COLUMNS of every CSV row as a tuple of stripped strings.
+    
+    Rows without a Google service or SKU ID are dropped here.
+    """
+    
+    if PYARROW_AVAILABLE:
+        # pyarrow can only skip rows whose column count differs from the
+        # header; note them and let the csv module below pad them instead
+        ragged_rows = []
+        
+        def on_invalid_row(row):
+            ragged_rows.append(row.number)
+            return "skip"
+        
+        # Read only the needed columns, all as text, in one columnar pass
+        try:
+            table = pa_csv.read_csv(
+                csv_path,
+                parse_options=pa_csv.ParseOptions(
+                    newlines_in_values=True,
+                    invalid_row_handler=on_invalid_row
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.string() for name in PRICING_COLUMNS},
+                    include_columns=list(PRICING_COLUMNS),
+                    include_missing_columns=True
+                )
+            )
+        except pa.ArrowInvalid:
+            # e.g. an empty file, which the csv module reads as no rows
+            table = None
+        if table is not None and not ragged_rows:
+            # Strip and drop keyless rows column-wise before going back to Python
+            columns = [
+                pc.utf8_trim_whitespace(table.column(name)).fill_null("")
+                for name in PRICING_COLUMNS
+            ]
+            keep = pc.and_(pc.not_equal(columns[0], ""), pc.not_equal(columns[2], ""))
+            yield from zip(*(pc.filter(column, keep).to_pylist() for column in columns))
+            return
+    
+    # utf-8-sig drops a leading BOM, as pyarrow does, so the first header matches
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        
+        # Resolve column positions once; absent columns read as ''
+        index = {name: i for i, name in enumerate(header)}
+        positions = [index.get(name) for name in PRICING_COLUMNS]
+        if None in positions:
+            pick = lambda row: tuple('' if i is None else row[i] for i in positions)
+        else:
+            pick = itemgetter(*positions)
+        
+        width = len(header)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row.extend([''] * (width - len(row)))
+            # Strip the key columns first so rejected rows cost two strips
+            values = pick(row)
+            service = values[0].strip()
+            sku_id = values[2].strip()
+            if not service or not sku_id:
+                continue
+            yield (
+                service, values[1].strip(), sku_id, values[3].strip(),
+                values[4].strip(), values[5].strip(), values[6].strip()
+            )
 
 def analyze_pricing_csv(csv_path: str) -> Dict:
     """Analyze pricing CSV and generate statistics."""
@@ -22,125 +212,108 @@ def analyze_pricing_csv(csv_path: str) -> Dict:
         "total_skus": 0,
         "services": defaultdict(int),
         "price_types": defaultdict(int),
-        "services_breakdown": defaultdict(lambda: {"skus": 0, "price_ranges": []}),
+        # Running price stats per service (priced SKUs only)
+        "services_breakdown": defaultdict(lambda: {
+            "skus": 0, "count": 0, "sum": 0.0, "min": float("inf"), "max": float("-inf")
+        }),
         "vertex_ai_models": {},
         "storage_pricing": {},
         "highest_prices": [],
         "free_tiers": [],
         "tiered_pricing": defaultdict(list)
     }
+    # Min-heap of the TOP_PRICES most expensive SKUs, keyed by (price, -row)
+    # so earlier rows win ties exactly as a stable descending sort would
+    top_prices = []
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    for service, service_desc, _, sku_desc, contract_price, unit, tier_start in (
+        _iter_pricing_rows(csv_path)
+    ):
+        try:
+            price = float(contract_price) if contract_price else 0.0
+            tier = float(tier_start) if tier_start else None
+        except ValueError:
+            continue
         
-        for row in reader:
-            service = row.get('Google service', '').strip()
-            service_desc = row.get('Service description', '').strip()
-            sku_id = row.get('SKU ID', '').strip()
-            sku_desc = row.get('SKU description', '').strip()
-            contract_price = row.get('Contract price ($)', '').strip()
-            unit = row.get('Unit description', '').strip()
-            tier_start = row.get('Tiered usage start', '').strip()
-            
-            if not service or not sku_id:
-                continue
-            
-            try:
-                price = float(contract_price) if contract_price else 0.0
-                tier = float(tier_start) if tier_start else None
-            except ValueError:
-                continue
-            
-            stats["total_skus"] += 1
-            stats["services"][service] += 1
-            
-            # Determine price type
-            price_type = "unknown"
-            if "input" in sku_desc.lower():
-                price_type = "input"
-            elif "output" in sku_desc.lower():
-                price_type = "output"
-            elif "storage" in sku_desc.lower():
-                price_type = "storage"
-            elif "egress" in sku_desc.lower() or "transfer" in sku_desc.lower():
-                price_type = "egress"
-            elif "operations" in sku_desc.lower() or "ops" in sku_desc.lower():
-                price_type = "operations"
-            elif "generation" in sku_desc.lower():
-                price_type = "generation"
-            elif "cpu" in sku_desc.lower():
-                price_type = "cpu"
-            elif "memory" in sku_desc.lower() or "ram" in sku_desc.lower():
-                price_type = "memory"
-            
-            stats["price_types"][price_type] += 1
-            
-            # Service breakdown
-            stats["services_breakdown"][service]["skus"] += 1
-            if price > 0:
-                stats["services_breakdown"][service]["price_ranges"].append(price)
-            
+        stats["total_skus"] += 1
+        stats["services"][service] += 1
+        
+        # Determine price type
+        price_type = classify_price_type(sku_desc.lower())
+        
+        stats["price_types"][price_type] += 1
+        
+        # Service breakdown
+        breakdown = stats["services_breakdown"][service]
+        breakdown["skus"] += 1
+        if price > 0:
+            breakdown["count"] += 1
+            breakdown["sum"] += price
+            if price < breakdown["min"]:
+                breakdown["min"] = price
+            if price > breakdown["max"]:
+                breakdown["max"] = price
+        
+        if service == "GCP":
             # Vertex AI specific tracking
-            if service == "GCP" and service_desc == "Vertex AI":
+            if service_desc == "Vertex AI":
                 if "Gemini" in sku_desc:
-                    model_name = "Unknown"
-                    if "2.5 Flash" in sku_desc:
-                        model_name = "Gemini 2.5 Flash"
-                    elif "2.5 Pro" in sku_desc:
-                        model_name = "Gemini 2.5 Pro"
-                    elif "3.0 Pro" in sku_desc:
-                        model_name = "Gemini 3.0 Pro"
-                    
-                    if model_name not in stats["vertex_ai_models"]:
-                        stats["vertex_ai_models"][model_name] = {
-                            "input": None,
-                            "output": None,
-                            "caching_input": None
-                        }
+                    model_name = next(
+                        (name for key, name in GEMINI_MODELS if key in sku_desc), "Unknown"
+                    )
+                    model = stats["vertex_ai_models"].setdefault(model_name, {
+                        "input": None,
+                        "output": None,
+                        "caching_input": None
+                    })
                     
+                    # Case-sensitive on purpose: price_type would also count
+                    # "Caching Input" SKUs as input
                     if "Input" in sku_desc and "Caching" not in sku_desc:
-                        stats["vertex_ai_models"][model_name]["input"] = price
+                        model["input"] = price
                     elif "Output" in sku_desc:
-                        stats["vertex_ai_models"][model_name]["output"] = price
+                        model["output"] = price
                     elif "Caching" in sku_desc:
-                        stats["vertex_ai_models"][model_name]["caching_input"] = price
+                        model["caching_input"] = price
             
             # Storage pricing
-            if service == "GCP" and service_desc == "Cloud Storage":
+            elif service_desc == "Cloud Storage":
                 if "Storage" in sku_desc and price > 0:
                     stats["storage_pricing"][sku_desc] = {
                         "price": price,
                         "unit": unit,
                         "tier_start": tier
                     }
-            
-            # Track highest prices
-            if price > 0:
-                stats["highest_prices"].append({
-                    "service": service,
-                    "sku": sku_desc,
-                    "price": price,
-                    "unit": unit
-                })
-            
-            # Track free tiers
-            if price == 0.0 and tier is not None:
-                stats["free_tiers"].append({
-                    "service": service,
-                    "sku": sku_desc,
-                    "free_up_to": tier,
-                    "unit": unit
-                })
-            
-            # Tiered pricing
-            if tier is not None and price > 0:
-                stats["tiered_pricing"][sku_desc].append({
-                    "tier_start": tier,
-                    "price": price
-                })
+        
+        # Track highest prices
+        if price > 0:
+            entry = (price, -stats["total_skus"], service, sku_desc, unit)
+            if len(top_prices) < TOP_PRICES:
+                heapq.heappush(top_prices, entry)
+            elif entry[:2] > top_prices[0][:2]:
+                heapq.heapreplace(top_prices, entry)
+        
+        # Track free tiers
+        if price == 0.0 and tier is not None:
+            stats["free_tiers"].append({
+                "service": service,
+                "sku": sku_desc,
+                "free_up_to": tier,
+                "unit": unit
+            })
+        
+        # Tiered pricing
+        if tier is not None and price > 0:
+            stats["tiered_pricing"][sku_desc].append({
+                "tier_start": tier,
+                "price": price
+            })
     
-    # Sort highest prices
-    stats["highest_prices"].sort(key=lambda x: x["price"], reverse=True)
+    # Highest prices, most expensive first
+    stats["highest_prices"] = [
+        {"service": service, "sku": sku_desc, "price": price, "unit": unit}
+        for price, _, service, sku_desc, unit in sorted(top_prices, reverse=True)
+    ]
     
     return stats
 
@@ -148,83 +321,76 @@ def analyze_pricing_csv(csv_path: str) -> Dict:
 def format_stats_report(stats: Dict) -> str:
     """Format statistics as a readable report."""
     
-    report = []
-    report.append("=" * 80)
-    report.append("📊 WEEKLY PRICING STATISTICS")
-    report.append("=" * 80)
-    report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append("")
+    out = io.StringIO()
+    out.write(f"{EQ_LINE}\n")
+    out.write("📊 WEEKLY PRICING STATISTICS\n")
+    out.write(f"{EQ_LINE}\n")
+    out.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    out.write("\n")
     
     # Overview
-    report.append("📈 OVERVIEW")
-    report.append("-" * 80)
-    report.append(f"Total SKUs Tracked: {stats['total_skus']}")
-    report.append(f"Services: {len(stats['services'])}")
-    report.append("")
+    out.write("📈 OVERVIEW\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write(f"Total SKUs Tracked: {stats['total_skus']}\n")
+    out.write(f"Services: {len(stats['services'])}\n")
+    out.write("\n")
     
     # Services breakdown
-    report.append("🏢 SERVICES BREAKDOWN")
-    report.append("-" * 80)
+    out.write("🏢 SERVICES BREAKDOWN\n")
+    out.write(f"{DASH_LINE}\n")
     for service, count in sorted(stats["services"].items(), key=lambda x: x[1], reverse=True):
-        price_ranges = stats["services_breakdown"][service]["price_ranges"]
-        if price_ranges:
-            avg_price = sum(price_ranges) / len(price_ranges)
-            min_price = min(price_ranges)
-            max_price = max(price_ranges)
-            report.append(f"  {service}: {count} SKUs")
-            report.append(f"    Price Range: ${min_price:.6f} - ${max_price:.6f}")
-            report.append(f"    Average Price: ${avg_price:.6f}")
+        breakdown = stats["services_breakdown"][service]
+        if breakdown["count"]:
+            out.write(_SERVICE_TMPL.format_map({
+                **breakdown,
+                "service": service,
+                "count": count,
+                "avg": breakdown["sum"] / breakdown["count"]
+            }))
         else:
-            report.append(f"  {service}: {count} SKUs (free tier only)")
-        report.append("")
+            out.write(_FREE_SERVICE_TMPL.format(service=service, count=count))
     
     # Vertex AI Models
     if stats["vertex_ai_models"]:
-        report.append("🤖 VERTEX AI MODEL PRICING")
-        report.append("-" * 80)
+        out.write("🤖 VERTEX AI MODEL PRICING\n")
+        out.write(f"{DASH_LINE}\n")
         for model, pricing in sorted(stats["vertex_ai_models"].items()):
-            report.append(f"  {model}:")
+            out.write(f"  {model}:\n")
             if pricing["input"]:
-                report.append(f"    Input: ${pricing['input']:.6f} per 1M tokens")
+                out.write(f"    Input: ${pricing['input']:.6f} per 1M tokens\n")
             if pricing["output"]:
-                report.append(f"    Output: ${pricing['output']:.6f} per 1M tokens")
+                out.write(f"    Output: ${pricing['output']:.6f} per 1M tokens\n")
             if pricing["caching_input"]:
-                report.append(f"    Caching Input: ${pricing['caching_input']:.6f} per 1M tokens")
+                out.write(f"    Caching Input: ${pricing['caching_input']:.6f} per 1M tokens\n")
                 if pricing["input"]:
                     savings = ((pricing["input"] - pricing["caching_input"]) / pricing["input"]) * 100
-                    report.append(f"    💰 Caching Savings: {savings:.1f}%")
-            report.append("")
+                    out.write(f"    💰 Caching Savings: {savings:.1f}%\n")
+            out.write("\n")
     
     # Price Types
-    report.append("💰 PRICE TYPE DISTRIBUTION")
-    report.append("-" * 80)
+    out.write("💰 PRICE TYPE DISTRIBUTION\n")
+    out.write(f"{DASH_LINE}\n")
     for ptype, count in sorted(stats["price_types"].items(), key=lambda x: x[1], reverse=True):
-        report.append(f"  {ptype.capitalize()}: {count} SKUs")
-    report.append("")
+        out.write(f"  {ptype.capitalize()}: {count} SKUs\n")
+    out.write("\n")
     
     # Top 5 Highest Prices
     if stats["highest_prices"]:
-        report.append("🔝 TOP 5 HIGHEST PRICES")
-        report.append("-" * 80)
-        for i, item in enumerate(stats["highest_prices"][:5], 1):
-            report.append(f"  {i}. {item['sku'][:60]}")
-            report.append(f"     ${item['price']:.6f} per {item['unit']}")
-            report.append(f"     Service: {item['service']}")
-            report.append("")
+        out.write("🔝 TOP 5 HIGHEST PRICES\n")
+        out.write(f"{DASH_LINE}\n")
+        for i, item in enumerate(stats["highest_prices"], 1):
+            out.write(_TOP_PRICE_TMPL.format_map({**item, "rank": i}))
     
     # Free Tiers
     if stats["free_tiers"]:
-        report.append("🆓 FREE TIERS")
-        report.append("-" * 80)
+        out.write("🆓 FREE TIERS\n")
+        out.write(f"{DASH_LINE}\n")
         for tier in stats["free_tiers"][:10]:
-            report.append(f"  {tier['sku'][:60]}")
-            report.append(f"     Free up to: {tier['free_up_to']} {tier['unit']}")
-            report.append(f"     Service: {tier['service']}")
-            report.append("")
+            out.write(_FREE_TIER_TMPL.format_map(tier))
     
     # Cost Optimization Insights
-    report.append("💡 COST OPTIMIZATION INSIGHTS")
-    report.append("-" * 80)
+    out.write("💡 COST OPTIMIZATION INSIGHTS\n")
+    out.write(f"{DASH_LINE}\n")
     
     # Caching savings
     caching_savings = []
@@ -239,20 +405,20 @@ def format_stats_report(stats: Dict) -> str:
             })
     
     if caching_savings:
-        report.append("  Caching Discounts Available:")
+        out.write("  Caching Discounts Available:\n")
         for item in caching_savings:
-            report.append(f"    {item['model']}: {item['savings_pct']:.1f}% off (${item['savings_abs']:.6f} per 1M tokens)")
-        report.append("")
+            out.write(_CACHING_SAVINGS_TMPL.format_map(item))
+        out.write("\n")
     
     # Tiered pricing opportunities
     tiered_count = len([k for k, v in stats["tiered_pricing"].items() if len(v) > 1])
     if tiered_count > 0:
-        report.append(f"  {tiered_count} SKUs have tiered pricing (volume discounts available)")
-        report.append("")
+        out.write(f"  {tiered_count} SKUs have tiered pricing (volume discounts available)\n")
+        out.write("\n")
     
-    report.append("=" * 80)
+    out.write(EQ_LINE)
     
-    return "\n".join(report)
+    return out.getvalue()
 
 
 def main():
@@ -5,14 +5,30 @@ Yuki Image Generation Usage Tracker
 Tracks Yuki's image generation usage and calculates costs.
 
 Usage:
-    python scripts/yuki_usage_tracker.py [--images N] [--update]
+    python scripts/yuki_usage_tracker.py [--images N] [--update] [--no-report]
 """
 
+import io
+import os
 import sys
 import json
-import argparse
 from pathlib import Path
-from datetime import datetime
+from collections import deque
+
+# Optional: orjson for faster history load/save
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+EQ_LINE = "=" * 80
+DASH_LINE = "-" * 80
+
+# Recent-sessions rows in the report
+_SESSION_TMPL = "  {rank}. {date}: {images:,} images = ${cost:.2f}\n"
+_NOTES_TMPL = "     Notes: {notes}\n"
 
 # Credit information
 CREDITS = {
@@ -26,154 +42,324 @@ CREDITS = {
     }
 }
 
-TOTAL_AVAILABLE = sum(c["remaining"] for c in CREDITS.values() if c["status"] == "Available")
+# Sum of CREDITS[*]["remaining"] where status == "Available"; keep in sync
+TOTAL_AVAILABLE = 1268.50
+if __debug__:
+    assert TOTAL_AVAILABLE == sum(
+        c["remaining"] for c in CREDITS.values() if c["status"] == "Available"
+    ), "TOTAL_AVAILABLE is out of sync with CREDITS"
 IMAGE_COST_PER_SHOT = 0.04  # Imagen 3/4 pricing
 
+# Sessions listed in the report by default, newest first
+RECENT_SESSIONS = 10
+
+# Large enough that the report goes out in a single write()
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# Running totals are rewritten on each update; sessions are only appended
+TOTALS_FILE = Path("data/yuki_usage_totals.json")
+SESSIONS_FILE = Path("data/yuki_sessions.ndjson")
+# Pre-split history (totals and sessions in one file), migrated on first load
+# while no session log exists yet
+LEGACY_HISTORY_FILE = Path("data/yuki_usage.json")
+REPORT_FILE = Path("data/yuki_usage_report.txt")
+# Cache key of the saved report, see _report_cache_key
+REPORT_META_FILE = Path("data/yuki_usage_report.meta")
+
 
-def load_usage_history() -> dict:
-    """Load usage history from file."""
-    history_file = Path("data/yuki_usage.json")
+def _encode_session(session: dict) -> bytes:
+    """One NDJSON line for the session log."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(session, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(session, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _migrate_legacy_history():
+    """Split a single-file data/yuki_usage.json into the totals file and session log."""
+    if ORJSON_AVAILABLE:
+        legacy = orjson.loads(LEGACY_HISTORY_FILE.read_bytes())
+    else:
+        with open(LEGACY_HISTORY_FILE, 'r') as f:
+            legacy = json.load(f)
     
-    if history_file.exists():
-        with open(history_file, 'r') as f:
-            return json.load(f)
+    with open(SESSIONS_FILE, 'wb') as f:
+        f.writelines(_encode_session(session) for session in legacy.pop("sessions", []))
+    save_usage_history(legacy)
+
+
+def _session_epoch(session: dict) -> float:
+    """Session time as epoch seconds; older sessions only carry the ISO string."""
+    if "ts_epoch" in session:
+        return session["ts_epoch"]
+    from datetime import datetime
+    return datetime.fromisoformat(session["timestamp"]).timestamp()
+
+
+def _backfill_session_totals(history: dict):
+    """Derive the session counters from the log for totals written before they existed."""
+    history["session_count"] = 0
+    history["first_session_at"] = history["last_session_at"] = None
+    history["first_session_epoch"] = history["last_session_epoch"] = None
+    for session in iter_sessions():
+        if history["first_session_at"] is None:
+            history["first_session_at"] = session["timestamp"]
+            history["first_session_epoch"] = _session_epoch(session)
+        history["last_session_at"] = session["timestamp"]
+        history["last_session_epoch"] = _session_epoch(session)
+        history["session_count"] += 1
+    save_usage_history(history)
+
+
+def _new_history(now_iso: str = None) -> dict:
+    """Empty usage totals (now_iso stamps created_at)."""
+    if now_iso is None:
+        # Only a fresh history needs the clock, so datetime is imported here
+        from datetime import datetime
+        now_iso = datetime.now().isoformat()
     
     return {
         "total_images_generated": 0,
         "total_cost": 0.0,
-        "sessions": [],
-        "created_at": datetime.now().isoformat()
+        "session_count": 0,
+        "first_session_at": None,
+        "last_session_at": None,
+        "first_session_epoch": None,
+        "last_session_epoch": None,
+        "created_at": now_iso
     }
 
 
+def _rebuild_totals(now_iso: str = None) -> dict:
+    """Recompute the totals file from the session log after it went missing."""
+    history = _new_history(now_iso)
+    for session in iter_sessions():
+        history["total_images_generated"] += session["images"]
+        history["total_cost"] = round(history["total_cost"] + session["cost"], 2)
+    _backfill_session_totals(history)
+    return history
+
+
+def load_usage_history(now_iso: str = None) -> dict:
+    """Load the usage totals from file (now_iso stamps a fresh history)."""
+    if not TOTALS_FILE.exists():
+        # The log is the source of truth once it exists; re-splitting the
+        # legacy file would truncate it back to the pre-migration sessions
+        if SESSIONS_FILE.exists():
+            return _rebuild_totals(now_iso)
+        if LEGACY_HISTORY_FILE.exists():
+            _migrate_legacy_history()
+    
+    if TOTALS_FILE.exists():
+        if ORJSON_AVAILABLE:
+            history = orjson.loads(TOTALS_FILE.read_bytes())
+        else:
+            with open(TOTALS_FILE, 'r') as f:
+                history = json.load(f)
+        if "first_session_epoch" not in history:
+            _backfill_session_totals(history)
+        return history
+    
+    return _new_history(now_iso)
+
+
 def save_usage_history(history: dict):
-    """Save usage history to file."""
-    history_file = Path("data/yuki_usage.json")
-    history_file.parent.mkdir(parents=True, exist_ok=True)
+    """Save the usage totals to file (atomically, via a temp file)."""
+    TOTALS_FILE.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(history_file, 'w') as f:
-        json.dump(history, f, indent=2)
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(history, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(history, indent=2).encode("utf-8")
+    
+    # One write to a sibling temp file, then rename over the old totals
+    tmp_path = TOTALS_FILE.with_name(TOTALS_FILE.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, TOTALS_FILE)
+
+
+def iter_sessions():
+    """Yield the recorded sessions from the append-only log, oldest first."""
+    if not SESSIONS_FILE.exists():
+        return
+    
+    loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+    with open(SESSIONS_FILE, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
 
 
 def add_usage_session(images: int, notes: str = ""):
     """Add a new usage session."""
-    history = load_usage_history()
+    # One clock read stamps the session, the totals and a fresh history
+    from datetime import datetime
+    now = datetime.now()
+    now_iso = now.isoformat()
+    now_epoch = now.timestamp()
+    history = load_usage_history(now_iso)
     
     session = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso,
+        "ts_epoch": now_epoch,
         "images": images,
         "cost": round(images * IMAGE_COST_PER_SHOT, 2),
         "notes": notes
     }
     
-    history["sessions"].append(session)
+    # Append one line instead of rewriting every past session
+    SESSIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(SESSIONS_FILE, 'ab') as f:
+        f.write(_encode_session(session))
+    
     history["total_images_generated"] += images
     history["total_cost"] = round(history["total_cost"] + session["cost"], 2)
-    history["last_updated"] = datetime.now().isoformat()
+    history["session_count"] += 1
+    if history["first_session_at"] is None:
+        history["first_session_at"] = now_iso
+        history["first_session_epoch"] = now_epoch
+    history["last_session_at"] = now_iso
+    history["last_session_epoch"] = now_epoch
+    history["last_updated"] = now_iso
     
     save_usage_history(history)
     return history
 
 
-def generate_report(history: dict = None):
-    """Generate usage report."""
+def generate_report(history: dict = None, recent_k: int = RECENT_SESSIONS):
+    """
+    Generate usage report.
+    
+    Totals and projections come from the totals file alone; the session
+    log is only read for the recent_k newest sessions (0 skips it).
+    """
     
     if history is None:
         history = load_usage_history()
     
-    report = []
-    report.append("=" * 80)
-    report.append("🎨 YUKI IMAGE GENERATION USAGE REPORT")
-    report.append("=" * 80)
-    report.append("")
+    # Bounded deque, so only the newest recent_k sessions stay in memory
+    recent_sessions = deque(iter_sessions(), maxlen=recent_k) if recent_k > 0 else ()
+    
+    # Figures used by several sections
+    total_cost = history["total_cost"]
+    total_images = history["total_images_generated"]
+    session_count = history["session_count"]
+    remaining_credits = TOTAL_AVAILABLE - total_cost
+    percent_used = total_cost / TOTAL_AVAILABLE * 100
+    
+    out = io.StringIO()
+    out.write(f"{EQ_LINE}\n")
+    out.write("🎨 YUKI IMAGE GENERATION USAGE REPORT\n")
+    out.write(f"{EQ_LINE}\n")
+    out.write("\n")
     
     # Current Status
-    report.append("💰 CURRENT STATUS")
-    report.append("-" * 80)
-    report.append(f"  Total Credits Available: ${TOTAL_AVAILABLE:.2f}")
-    report.append(f"  Cost per Image: ${IMAGE_COST_PER_SHOT:.4f}")
-    report.append("")
+    out.write("💰 CURRENT STATUS\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write(f"  Total Credits Available: ${TOTAL_AVAILABLE:.2f}\n")
+    out.write(f"  Cost per Image: ${IMAGE_COST_PER_SHOT:.4f}\n")
+    out.write("\n")
     
     # Usage Summary
-    report.append("📊 USAGE SUMMARY")
-    report.append("-" * 80)
-    report.append(f"  Total Images Generated: {history['total_images_generated']:,}")
-    report.append(f"  Total Cost: ${history['total_cost']:.2f}")
-    report.append(f"  Credits Remaining: ${TOTAL_AVAILABLE - history['total_cost']:.2f}")
-    report.append(f"  % of Credits Used: {(history['total_cost'] / TOTAL_AVAILABLE * 100):.2f}%")
-    report.append("")
+    out.write("📊 USAGE SUMMARY\n")
+    out.write(f"{DASH_LINE}\n")
+    out.write(f"  Total Images Generated: {total_images:,}\n")
+    out.write(f"  Total Cost: ${total_cost:.2f}\n")
+    out.write(f"  Credits Remaining: ${remaining_credits:.2f}\n")
+    out.write(f"  % of Credits Used: {percent_used:.2f}%\n")
+    out.write("\n")
     
     # Recent Sessions
-    if history["sessions"]:
-        report.append("📅 RECENT SESSIONS")
-        report.append("-" * 80)
+    if recent_sessions:
+        out.write("📅 RECENT SESSIONS\n")
+        out.write(f"{DASH_LINE}\n")
         
-        # Show last 10 sessions
-        recent_sessions = history["sessions"][-10:]
         for i, session in enumerate(reversed(recent_sessions), 1):
-            date = datetime.fromisoformat(session["timestamp"]).strftime("%Y-%m-%d %H:%M")
-            report.append(f"  {i}. {date}: {session['images']:,} images = ${session['cost']:.2f}")
+            # "YYYY-MM-DDTHH:MM..." -> "YYYY-MM-DD HH:MM" without parsing
+            date = session["timestamp"][:16].replace("T", " ")
+            out.write(_SESSION_TMPL.format_map({**session, "rank": i, "date": date}))
             if session.get("notes"):
-                report.append(f"     Notes: {session['notes']}")
-        report.append("")
+                out.write(_NOTES_TMPL.format_map(session))
+        out.write("\n")
     
     # Cost Analysis
-    report.append("💵 COST ANALYSIS")
-    report.append("-" * 80)
+    out.write("💵 COST ANALYSIS\n")
+    out.write(f"{DASH_LINE}\n")
     
-    if history["total_images_generated"] > 0:
-        avg_cost_per_session = history["total_cost"] / len(history["sessions"]) if history["sessions"] else 0
-        avg_images_per_session = history["total_images_generated"] / len(history["sessions"]) if history["sessions"] else 0
+    if total_images > 0:
+        avg_cost_per_session = total_cost / session_count if session_count else 0
+        avg_images_per_session = total_images / session_count if session_count else 0
         
-        report.append(f"  Average per session: {avg_images_per_session:.0f} images = ${avg_cost_per_session:.2f}")
-        report.append(f"  Total sessions: {len(history['sessions'])}")
-        report.append("")
+        out.write(f"  Average per session: {avg_images_per_session:.0f} images = ${avg_cost_per_session:.2f}\n")
+        out.write(f"  Total sessions: {session_count}\n")
+        out.write("\n")
         
         # Projections
-        if len(history["sessions"]) > 0:
+        if session_count > 0:
             # Calculate daily average if we have multiple days
-            if len(history["sessions"]) >= 2:
-                first_date = datetime.fromisoformat(history["sessions"][0]["timestamp"])
-                last_date = datetime.fromisoformat(history["sessions"][-1]["timestamp"])
-                days_diff = (last_date - first_date).days + 1
-                daily_avg_images = history["total_images_generated"] / days_diff
-                daily_avg_cost = history["total_cost"] / days_diff
+            if session_count >= 2:
+                span = history["last_session_epoch"] - history["first_session_epoch"]
+                days_diff = int(span // 86400) + 1
+                daily_avg_images = total_images / days_diff
+                daily_avg_cost = total_cost / days_diff
                 
-                report.append("  📈 PROJECTIONS (based on current usage):")
-                report.append(f"     Daily average: {daily_avg_images:.0f} images = ${daily_avg_cost:.2f}")
-                report.append(f"     Weekly projection: {daily_avg_images * 7:.0f} images = ${daily_avg_cost * 7:.2f}")
-                report.append(f"     Monthly projection: {daily_avg_images * 30:.0f} images = ${daily_avg_cost * 30:.2f}")
+                out.write("  📈 PROJECTIONS (based on current usage):\n")
+                out.write(f"     Daily average: {daily_avg_images:.0f} images = ${daily_avg_cost:.2f}\n")
+                out.write(f"     Weekly projection: {daily_avg_images * 7:.0f} images = ${daily_avg_cost * 7:.2f}\n")
+                out.write(f"     Monthly projection: {daily_avg_images * 30:.0f} images = ${daily_avg_cost * 30:.2f}\n")
                 
                 # Days remaining
-                remaining_credits = TOTAL_AVAILABLE - history["total_cost"]
                 if daily_avg_cost > 0:
                     days_remaining = remaining_credits / daily_avg_cost
-                    report.append(f"     ⏰ Credits will last: {days_remaining:.1f} days at current rate")
-                report.append("")
+                    out.write(f"     ⏰ Credits will last: {days_remaining:.1f} days at current rate\n")
+                out.write("\n")
     
     # Recommendations
-    report.append("💡 RECOMMENDATIONS")
-    report.append("-" * 80)
+    out.write("💡 RECOMMENDATIONS\n")
+    out.write(f"{DASH_LINE}\n")
     
-    remaining_credits = TOTAL_AVAILABLE - history["total_cost"]
     max_images_remaining = int(remaining_credits / IMAGE_COST_PER_SHOT)
     
-    report.append(f"  1. ✅ You can generate {max_images_remaining:,} more images")
-    report.append(f"  2. ✅ Current burn rate: ${history['total_cost']:.2f} ({history['total_cost'] / TOTAL_AVAILABLE * 100:.2f}% of credits)")
+    out.write(f"  1. ✅ You can generate {max_images_remaining:,} more images\n")
+    out.write(f"  2. ✅ Current burn rate: ${total_cost:.2f} ({percent_used:.2f}% of credits)\n")
     
-    if history["total_cost"] > 0:
-        cost_per_100 = (history["total_cost"] / history["total_images_generated"]) * 100
-        report.append(f"  3. 💰 Average cost per 100 images: ${cost_per_100:.2f}")
+    if total_cost > 0:
+        cost_per_100 = (total_cost / total_images) * 100
+        out.write(f"  3. 💰 Average cost per 100 images: ${cost_per_100:.2f}\n")
     
-    report.append("  4. 📊 Keep stress testing - you're using credits efficiently!")
-    report.append("")
+    out.write("  4. 📊 Keep stress testing - you're using credits efficiently!\n")
+    out.write("\n")
     
-    report.append("=" * 80)
+    out.write(EQ_LINE)
     
-    return "\n".join(report)
+    return out.getvalue()
+
+
+def _report_cache_key(history: dict) -> list:
+    """Everything the default report depends on, as a JSON-friendly list."""
+    return [
+        os.path.getmtime(__file__),
+        TOTAL_AVAILABLE,
+        IMAGE_COST_PER_SHOT,
+        RECENT_SESSIONS,
+        history.get("last_updated"),
+        history["total_images_generated"],
+        history["total_cost"],
+        history["session_count"],
+    ]
+
+
+def _read_report_cache_key():
+    """Key stored next to the saved report, or None if missing/unreadable."""
+    try:
+        return json.loads(REPORT_META_FILE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
 
 
 def main():
+    # Imported here: only the CLI needs it, not code importing this module
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Track Yuki image generation usage")
     parser.add_argument(
         "--images",
@@ -192,25 +378,42 @@ def main():
         default="",
         help="Notes for this session"
     )
+    parser.add_argument(
+        "--no-report",
+        action="store_true",
+        help="Skip generating and saving the report (for scripted updates)"
+    )
     
     args = parser.parse_args()
     
-    if args.update and args.images:
+    updated = bool(args.update and args.images)
+    if updated:
         print(f"📝 Recording session: {args.images} images")
         history = add_usage_session(args.images, args.notes)
         print(f"✅ Updated! Total: {history['total_images_generated']:,} images, ${history['total_cost']:.2f} cost")
         print("")
     
-    report = generate_report()
-    print(report)
+    if args.no_report:
+        return
     
-    # Save report
-    report_file = Path("data/yuki_usage_report.txt")
-    report_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+    if not updated:
+        history = load_usage_history()
     
-    print(f"\n💾 Report saved to: {report_file}")
+    # Reuse the saved report when nothing it depends on has changed
+    cache_key = _report_cache_key(history)
+    if not updated and REPORT_FILE.exists() and _read_report_cache_key() == cache_key:
+        report = REPORT_FILE.read_text(encoding='utf-8')
+    else:
+        report = generate_report(history)
+        
+        # Save report, then the key it was built from
+        REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(REPORT_FILE, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(report)
+        REPORT_META_FILE.write_text(json.dumps(cache_key), encoding='utf-8')
+    
+    print(report)
+    print(f"\n💾 Report saved to: {REPORT_FILE}")
 
 
 if __name__ == "__main__":